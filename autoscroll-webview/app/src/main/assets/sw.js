@@ -1,29 +1,41 @@
-// Service Worker for AutoScroll Text Reader PWA
-const CACHE_NAME = 'autoscroll-v1.0';
-const urlsToCache = [
-  './',
-  './web_autoscroll.html',
-  './manifest.json'
-];
+// Generated by create_simple_apk.py from the hashed asset list - do not edit
+const CACHE_NAME = 'autoscroll-precache';
+const PRECACHE = [["./", "1bb7f6f51dce36f5"], ["index.html", "1bb7f6f51dce36f5"], ["manifest.c2e56243a6.json", "5e77bdcf7b3c03a9"]];
 
-// Install event
-self.addEventListener('install', function(event) {
-  event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(function(cache) {
-        return cache.addAll(urlsToCache);
-      })
-  );
+function cacheKey(url, revision) {
+  return new URL(url, self.location).href + '?__rev=' + revision;
+}
+const KEYS = new Map(PRECACHE.map(([url, revision]) =>
+  [new URL(url, self.location).href, cacheKey(url, revision)]));
+
+self.addEventListener('install', event => {
+  event.waitUntil(caches.open(CACHE_NAME).then(cache =>
+    Promise.all(PRECACHE.map(([url, revision]) => {
+      const key = cacheKey(url, revision);
+      // Files whose revision is already cached are not downloaded again
+      return cache.match(key).then(hit => hit || fetch(url, {cache: 'no-cache'}).then(response => {
+        if (!response.ok) throw new Error('Failed to fetch ' + url);
+        return cache.put(key, response);
+      }));
+    }))
+  ).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+  const current = new Set(KEYS.values());
+  event.waitUntil(caches.keys().then(names =>
+    Promise.all(names.filter(name => name !== CACHE_NAME).map(name => caches.delete(name)))
+  ).then(() => caches.open(CACHE_NAME)).then(cache => cache.keys().then(requests =>
+    Promise.all(requests.filter(request => !current.has(request.url)).map(request => cache.delete(request)))
+  )).then(() => self.clients.claim()));
 });
 
-// Fetch event
-self.addEventListener('fetch', function(event) {
-  event.respondWith(
-    caches.match(event.request)
-      .then(function(response) {
-        // Return cached version or fetch from network
-        return response || fetch(event.request);
-      }
-    )
-  );
-});
\ No newline at end of file
+self.addEventListener('fetch', event => {
+  const url = new URL(event.request.url);
+  url.hash = '';
+  const key = KEYS.get(url.href);
+  if (!key) return;
+  event.respondWith(caches.open(CACHE_NAME)
+    .then(cache => cache.match(key))
+    .then(response => response || fetch(event.request)));
+});
@@ -0,0 +1,25 @@
+"""
+AutoScroll text reader engine
+Shared by main.py and simple_android_main.py; submodules load on first use
+"""
+
+__all__ = ["SimpleAutoScrollApp", "TextIndex", "TerminalRenderer", "TickScheduler", "ScrollEngine", "main"]
+
+_EXPORTS = {
+    "SimpleAutoScrollApp": "app",
+    "TextIndex": "index",
+    "TerminalRenderer": "renderer",
+    "TickScheduler": "scheduler",
+    "ScrollEngine": "engine",
+    "main": "cli",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'autoscroll' has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
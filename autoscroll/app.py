@@ -0,0 +1,602 @@
+#!/usr/bin/env python3
+"""
+Terminal reader app for the AutoScroll text reader
+Holds the loaded text, its index and the scroll state, and turns menu commands into engine work
+"""
+
+import time
+import os
+
+from .renderer import TerminalRenderer, terminal_size
+from .index import TextIndex
+from .scheduler import CATCH_UP
+from .engine import ScrollEngine
+from .instrumentation import STATS
+
+# Header, footer and prompt lines drawn around the text window
+FRAME_CHROME_LINES = 7
+# Streaming texts are decoded at least this far past the visible window
+STREAM_LOOKAHEAD = 256 * 1024
+
+TEXT_PROMPT = "Enter your text (press Enter twice to finish):"
+ARGUMENT_PROMPTS = {
+    'f': "File path: ",
+    'g': "Line number or percentage (e.g. 120 or 50%): ",
+    'l': "Document number: ",
+    '/': "Search for: ",
+}
+
+SAMPLE_TEXT = """Welcome to AutoScroll Text Reader!
+
+This is a mobile automatic text scrolling application designed for Android devices. 
+
+Features:
+• Automatic text scrolling with adjustable speed
+• Play/pause controls
+• Reset functionality  
+• Mobile-optimized interface
+• Works on Android phones and tablets
+
+Instructions:
+1. Load your text content
+2. Adjust the scrolling speed
+3. Start auto-scrolling
+4. Enjoy hands-free reading!
+
+This app is perfect for:
+- Reading long articles
+- Studying documents
+- Hands-free content consumption
+- Accessibility needs
+
+The app automatically scrolls through your text at a comfortable pace, allowing you to read without touching the screen. You can adjust the speed from very slow (0.1x) to very fast (5.0x) to match your reading preference.
+
+Built with Python for maximum compatibility and performance on Android devices."""
+
+class SimpleAutoScrollApp:
+    def __init__(self, tick_policy=CATCH_UP, engine_class=ScrollEngine, compact_text=False, prerender=0,
+                 markdown=False):
+        self.text = ""
+        # Keep non-ASCII texts as UTF-8 bytes instead of a wide str
+        self.compact_text = compact_text
+        # Render pasted text and the sample as Markdown (.md files always are)
+        self.markdown = markdown
+        self.scroll_speed = 1.0
+        self.scroll_position = 0
+        self.running = True
+        self.renderer = TerminalRenderer()
+        self.index = TextIndex.build("")
+        self.library = None
+        self.document = None
+        self.query = None
+        self.match = None
+        # SyncLeader or SyncFollower when displays are kept in step
+        self.sync = None
+        # Producer of upcoming frames; without one each tick composes its own
+        self.pipeline = None
+        # SessionRecorder logging commands for a later replay
+        self.recorder = None
+        # Where commands and their arguments are read from
+        self.read_line = input
+        # Let large files finish indexing while the reader scrolls
+        self.background_index = True
+        if prerender:
+            from .prerender import FramePipeline
+            self.pipeline = FramePipeline(prerender)
+        self._frame_size = None
+        # All scrolling state below is changed only on the engine thread
+        self.engine = engine_class(self._tick, 1.0 / self.scroll_speed, tick_policy)
+        
+    @property
+    def is_scrolling(self):
+        return self.engine.scrolling
+        
+    def load_text(self, text_content):
+        """Load text for scrolling"""
+        started = time.perf_counter()
+        if self.markdown and isinstance(text_content, str):
+            from .richtext import parse_markdown
+            
+            text_content = parse_markdown(text_content)
+        elif self.compact_text and isinstance(text_content, str) and not text_content.isascii():
+            from .source import Utf8Text
+            
+            text_content = Utf8Text(text_content)
+        index = TextIndex.build(text_content, self.text_size()[0], background=self.background_index)
+        if STATS.enabled:
+            STATS.record("load_index", time.perf_counter() - started)
+        self.engine.submit(lambda: self._swap_text(text_content, index), wait=True)
+        print(f"✅ Text loaded: {len(text_content)} characters")
+        if hasattr(text_content, "nbytes"):
+            print(f"🗜️ Stored as UTF-8: {text_content.nbytes} bytes")
+        print(f"🗂️ Indexed {index.line_count()} lines in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if index.builder is not None:
+            print(f"⚙️ Indexing the rest in the background on {index.builder.workers} processes")
+        
+    def load_file(self, path):
+        """Open a file through the library, resuming where it was left"""
+        library = self.get_library()
+        if library is None:
+            from .source import open_source
+            
+            source = open_source(path)
+            self.load_text(source)
+            print(f"🗂️ Mapped {path} ({len(source)} bytes)")
+            return
+        self.open_document(library.add(path))
+        
+    def load_pasted(self, text_content):
+        """Keep pasted text in the library so it survives a restart"""
+        library = self.get_library()
+        if library is None:
+            self.load_text(text_content)
+            return
+        self.open_document(library.add_text(text_content, suffix=".md" if self.markdown else ".txt"))
+        
+    def open_document(self, doc_id):
+        """Open a library document at its saved position and speed"""
+        library = self.get_library()
+        started = time.perf_counter()
+        cached = library.is_cached(doc_id)
+        document = library.open(doc_id, self.text_size()[0], self.background_index)
+        self.engine.submit(lambda: self._swap_text(document.text, document.index, document), wait=True)
+        self.set_speed(document.speed)
+        line = self.index.line_of(self.scroll_position) + 1
+        source = "from cache" if cached else f"{len(document.text)} bytes ready"
+        print(f"📚 Opened '{document.title}' at line {line}/{document.index.line_count()} "
+              f"({source}) in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if document.index.builder is not None:
+            print(f"⚙️ Indexing the rest in the background on {document.index.builder.workers} processes")
+        
+    def get_library(self):
+        """The document library, created on first use; None if it cannot be opened"""
+        if self.library is None:
+            import sqlite3
+            from .library import Library
+            
+            try:
+                self.library = Library()
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ Library unavailable, documents will not be remembered: {e}")
+                self.library = False
+        return self.library or None
+        
+    def print_library(self):
+        library = self.get_library()
+        rows = library.documents() if library else []
+        if not rows:
+            print("📚 Library is empty")
+            return
+        print("📚 Library:")
+        for doc_id, title, size, length, position, _ in rows:
+            # Compressed documents are longer than their file once decoded
+            length = length or size
+            percent = min(100, position * 100 // length) if length else 0
+            print(f"  {doc_id:>4}. {title}  ({size} bytes, {percent}% read)")
+        
+    def save_position(self):
+        """Remember where the current library document was left"""
+        if self.document is not None and self.library:
+            self.library.save_position(self.document.id, self.scroll_position, self.scroll_speed,
+                                       self._full_length())
+        
+    def _swap_text(self, text_content, index, document=None):
+        self.engine.stop()
+        self._invalidate_frames()
+        self.save_position()
+        if self.document is None:
+            self.close_text()  # library documents stay open in its cache
+            if self.index.builder is not None:
+                self.index.builder.close()
+        self.text = text_content
+        self.index = index
+        self.document = document
+        self.match = None
+        position = self._ensure_decoded(document.position) if document else 0
+        self.scroll_position = self.index.row_start(position)
+        self._publish()
+        
+    def _ensure_decoded(self, position):
+        """Decode a streaming text (or index a large one) past `position`;
+        returns the position clamped to the text"""
+        if self.index.builder is not None:
+            self.index.builder.wait_for(position + STREAM_LOOKAHEAD)
+        elif getattr(self.text, "streaming", False):
+            while not self.text.complete and self.index.length < position + STREAM_LOOKAHEAD:
+                more = self.text.read_more()
+                if not more:
+                    break
+                self.index.feed(more)
+        return min(position, self.index.length)
+        
+    def _incomplete(self):
+        """True while the index does not cover the whole text yet"""
+        if self.index.builder is not None:
+            return True
+        return getattr(self.text, "streaming", False) and not self.text.complete
+        
+    def _at_end(self, rows):
+        if rows[-1][1] < len(self.text):
+            return False
+        return getattr(self.text, "complete", True)
+        
+    def close_text(self):
+        """Release the current file-backed text, if any"""
+        close = getattr(self.text, "close", None)
+        if close is not None:
+            close()
+        self.text = ""
+        
+    def text_size(self):
+        """Columns and rows available for the text window"""
+        columns, lines = terminal_size()
+        return columns, max(1, lines - FRAME_CHROME_LINES)
+        
+    def seek(self, target):
+        """Jump to a line number or a percentage such as '50%'"""
+        target = target.strip()
+        if target.endswith("%"):
+            percent = float(target[:-1])
+            self.engine.submit(lambda: self._jump_to_percent(percent), wait=True)
+        else:
+            line = int(target) - 1
+            self.engine.submit(lambda: self._jump_to_line(line), wait=True)
+        print(f"🎯 Jumped to line {self.index.line_of(self.scroll_position) + 1}/{self.index.line_count()}")
+        
+    def _jump_to_percent(self, percent):
+        if self._incomplete():
+            # The index covers only part of the text; aim at the whole of it
+            percent = max(0.0, min(100.0, percent))
+            self._jump(int(self._full_length() * percent / 100))
+            return
+        self._jump(self.index.position_at_percent(percent))
+        
+    def _full_length(self):
+        """Length of the whole text, estimated for a stream not decoded to its end"""
+        estimated_length = getattr(self.text, "estimated_length", None)
+        return estimated_length() if estimated_length is not None else len(self.text)
+        
+    def _jump_to_line(self, line):
+        # Streaming and still indexing texts only know the lines seen so far
+        while self._incomplete() and self.index.line_count() <= line:
+            self._ensure_decoded(self.index.length)
+        self._jump(self.index.line_start(line))
+        
+    def search(self, query):
+        """Jump to the next match of a new query"""
+        self.query = query
+        self.find_next()
+        
+    def find_next(self, backward=False):
+        """Jump to the next (or previous) match of the last query; scrolling carries on"""
+        if not self.query:
+            print("❌ Nothing to search for yet")
+            return
+        query = self.query
+        started = time.perf_counter()
+        result = []
+        self.engine.submit(lambda: result.append(self._find(query, backward)), wait=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        hit, wrapped = result[0]
+        if hit is None:
+            print(f"❌ No match for '{query}'")
+            return
+        note = " (wrapped)" if wrapped else ""
+        print(f"🔍 '{query}' at line {self.index.line_of(hit) + 1}/{self.index.line_count()}{note} in {elapsed:.2f} ms")
+        
+    def _find(self, query, backward):
+        search = self.index.search
+        if search is None:
+            return None, False
+        # Repeated searches move on from the match still shown on screen
+        start = self.scroll_position
+        if self.match is not None and self.index.row_start(self.match) == self.scroll_position:
+            start = self.match if backward else self.match + 1
+        hit = search.find(self.text, query, start, backward)
+        while hit is None and not backward and self._incomplete():
+            self._ensure_decoded(self.index.length)
+            hit = search.find(self.text, query, start, backward)
+        wrapped = False
+        if hit is None:
+            wrapped = True
+            # Wrapping backward starts from the very end
+            while backward and self._incomplete():
+                self._ensure_decoded(self.index.length)
+            hit = search.find(self.text, query, search.length if backward else 0, backward)
+        if hit is not None:
+            self.match = hit
+            self._jump(hit)
+        return hit, wrapped
+        
+    def _jump(self, position):
+        self._invalidate_frames()
+        self.scroll_position = self.index.row_start(self._ensure_decoded(position))
+        if self.engine.scrolling:
+            self.render_frame()
+        self._publish()
+        
+    def set_speed(self, speed):
+        """Set scrolling speed"""
+        speed = round(max(0.1, min(5.0, speed)), 2)
+        # Waiting keeps repeated +/- presses from reading a stale speed
+        self.engine.submit(lambda: self._apply_speed(speed), wait=True)
+        print(f"⚡ Speed set to: {speed}x")
+        
+    def _apply_speed(self, speed):
+        self.scroll_speed = speed
+        self._invalidate_frames()  # the header shows the speed
+        self.engine.set_interval(1.0 / speed)
+        self._publish()
+        
+    def start_scroll(self):
+        """Start auto-scrolling"""
+        if not self.text:
+            print("❌ No text loaded!")
+            return
+            
+        print("▶️ Starting auto-scroll...")
+        self.engine.submit(self._begin)
+        
+    def _begin(self):
+        if self.engine.scrolling:
+            return
+        self.renderer.invalidate()
+        self.renderer.reset_stats()
+        self.engine.start()
+        self._tick(0)
+        
+    def _tick(self, due):
+        """Advance `due` display rows and draw; False once the end is shown"""
+        if STATS.enabled:
+            tick_started = time.perf_counter()
+            STATS.count("rows_advanced", due)
+        if due and self.recorder is not None:
+            self.recorder.tick()
+        if self.index.builder is not None:
+            self.index.builder.merge_ready()
+        if due:
+            self.scroll_position = self.index.advance(self.scroll_position, due)
+        self._ensure_decoded(self.scroll_position)
+        rows = self.render_frame()
+        self._publish()
+        if STATS.enabled:
+            STATS.record("tick", time.perf_counter() - tick_started)
+        if self._at_end(rows):
+            print("\n🏁 Reached end of text!")
+            self._halt()
+            return False
+        return True
+        
+    def _halt(self):
+        if not self.engine.scrolling:
+            return
+        self.engine.stop()
+        self._publish()
+        self.save_position()
+        print(self.renderer.report())
+        print(self.engine.scheduler.report())
+        if self.pipeline is not None:
+            print(self.pipeline.report())
+        
+    def _publish(self):
+        """Send the scroll state to sync followers, if leading"""
+        if self.sync is not None:
+            self.sync.publish()
+        
+    def render_frame(self):
+        """Draw the rows visible at the current position and return them"""
+        size = self.text_size()
+        if size != self._frame_size:
+            self._invalidate_frames()
+            self._frame_size = size
+            self.index.set_width(size[0])
+            if self.recorder is not None:
+                self.recorder.resized()
+        pipeline = self.pipeline
+        if getattr(self.text, "streaming", False):
+            pipeline = None  # pages are decoded on the engine thread only
+        elif self.index.builder is not None:
+            pipeline = None  # the index still grows on the engine thread
+        frame = pipeline.take(self.scroll_position) if pipeline is not None else None
+        if frame is None:
+            compose = self._composer(size[1])
+            frame = compose(self.scroll_position)
+            if pipeline is not None:
+                index = self.index
+                advance = lambda position: index.advance(position, 1)
+                pipeline.reset(advance(self.scroll_position), compose, advance)
+        lines, rows = frame
+        # Redraw only the lines that changed since the last frame
+        self.renderer.render(lines)
+        return rows
+        
+    def _composer(self, height):
+        """Frame builder for the current text, index and speed
+
+        It only reads what it captures, so the pre-render producer can run
+        it off the engine thread. Rendered Markdown is styled from its
+        prebuilt runs when the terminal understands ANSI.
+        """
+        text, index, speed = self.text, self.index, self.scroll_speed
+        styled = getattr(text, "ansi", None) if self.renderer.ansi else None
+        
+        def compose(position):
+            if STATS.enabled:
+                phase_started = time.perf_counter()
+            rows = index.rows(position, height)
+            if STATS.enabled:
+                sliced = time.perf_counter()
+                STATS.record("rows", sliced - phase_started)
+            if styled is None:
+                current_lines = [text[start:end].rstrip("\n") for start, end in rows]
+            else:
+                current_lines = [styled(start, end) for start, end in rows]
+            line = index.line_of(position) + 1
+            if STATS.enabled:
+                STATS.record("slice", time.perf_counter() - sliced)
+            return [
+                "=" * 50,
+                "📱 AutoScroll Text Reader",
+                f"⚡ Speed: {speed}x | Line: {line}/{index.line_count()} | Position: {position}/{len(text)}",
+                "=" * 50,
+                *current_lines,
+                "=" * 50,
+                "Commands: [p]ause, [r]eset, [q]uit",
+            ], rows
+        
+        return compose
+        
+    def _invalidate_frames(self):
+        if self.pipeline is not None:
+            self.pipeline.invalidate()
+        
+    def pause_scroll(self):
+        """Pause scrolling"""
+        self.engine.submit(self._halt, wait=True)
+        print("⏸️ Scrolling paused")
+        
+    def reset_scroll(self):
+        """Reset to beginning"""
+        self.engine.submit(lambda: self._jump(0))
+        print("⏮️ Reset to beginning")
+        
+    def shutdown(self):
+        """Stop the engine thread and release the loaded text"""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        if self.engine.alive:
+            self.engine.submit(self.save_position, wait=True)
+        self.engine.shutdown()
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+        if self.sync is not None:
+            self.sync.close()
+            self.sync = None
+        if self.document is None:
+            self.close_text()
+            if self.index.builder is not None:
+                self.index.builder.close()
+        if self.library:
+            self.library.close()
+            self.library = None
+        
+    def load_initial(self, path=None):
+        """Load the document given on the command line or the sample text"""
+        if self.recorder is not None:
+            with self.recorder.command("init", path):
+                self._load_initial(path)
+        else:
+            self._load_initial(path)
+        
+    def _load_initial(self, path):
+        if path:
+            self.load_file(path)
+        else:
+            self.load_text(SAMPLE_TEXT)
+        
+    def print_menu(self):
+        print("\n📱 AutoScroll Commands:")
+        print("1. [s] Start scrolling")
+        print("2. [p] Pause scrolling") 
+        print("3. [r] Reset to beginning")
+        print("4. [+] Increase speed")
+        print("5. [-] Decrease speed")
+        print("6. [t] Load custom text")
+        print("7. [f] Load text file")
+        print("8. [l] Open from library")
+        print("9. [g] Go to line or percentage")
+        print("10. [/] Search")
+        print("11. [n] Next match")
+        print("12. [b] Previous match")
+        print("13. [i] Show performance stats")
+        print("14. [q] Quit")
+        
+    def handle_command(self, choice, argument=None):
+        """Run one menu command; prompting commands receive their input as `argument`"""
+        if self.recorder is None:
+            self._run_command(choice, argument)
+            return
+        with self.recorder.command(choice, argument):
+            self._run_command(choice, argument)
+        
+    def _run_command(self, choice, argument):
+        if choice == 's':
+            self.start_scroll()
+        elif choice == 'p':
+            self.pause_scroll()
+        elif choice == 'r':
+            self.reset_scroll()
+        elif choice == '+':
+            self.set_speed(self.scroll_speed + 0.1)
+        elif choice == '-':
+            self.set_speed(self.scroll_speed - 0.1)
+        elif choice == 't':
+            if argument and argument.strip():
+                self.load_pasted(argument)
+        elif choice == 'f':
+            if argument and argument.strip():
+                self.load_file(os.path.expanduser(argument.strip()))
+        elif choice == 'g':
+            if argument and argument.strip():
+                self.seek(argument)
+        elif choice == 'l':
+            if argument and argument.strip():
+                self.open_document(int(argument))
+        elif choice == '/':
+            if argument and argument.strip():
+                self.search(argument.strip())
+        elif choice == 'n':
+            self.find_next()
+        elif choice == 'b':
+            self.find_next(backward=True)
+        elif choice == 'i':
+            print(STATS.report())
+            if self.sync is not None:
+                print(self.sync.report())
+        elif choice == 'q':
+            self.running = False
+            print("👋 Goodbye!")
+        else:
+            print("❌ Invalid command")
+        
+    def read_argument(self, choice):
+        """Prompt for the input a command needs, if any"""
+        if choice == 't':
+            print(TEXT_PROMPT)
+            lines = []
+            while True:
+                line = self.read_line()
+                if line == "" and len(lines) > 0 and lines[-1] == "":
+                    break
+                lines.append(line)
+            return "\n".join(lines[:-1])  # Remove last empty line
+        if choice == 'l':
+            self.print_library()
+        if choice in ARGUMENT_PROMPTS:
+            return self.read_line(ARGUMENT_PROMPTS[choice])
+        return None
+        
+    def run_interactive(self, path=None):
+        """Run interactive mode"""
+        print("🚀 AutoScroll Text Reader - Android Edition")
+        print("=" * 50)
+        
+        self.load_initial(path)
+        
+        while self.running:
+            self.print_menu()
+            
+            try:
+                choice = self.read_line("\nEnter command: ").lower().strip()
+                self.handle_command(choice, self.read_argument(choice))
+                    
+            except (KeyboardInterrupt, EOFError):
+                self.running = False
+                print("\n👋 Goodbye!")
+                break
+            except Exception as e:
+                print(f"❌ Error: {e}")
+        
+        self.shutdown()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Single-threaded asyncio front end for the AutoScroll text reader
+Keys are read through the event loop in cbreak mode, so commands act without Enter
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+from .app import SimpleAutoScrollApp, ARGUMENT_PROMPTS, TEXT_PROMPT
+from .engine import AsyncScrollEngine
+from .scheduler import CATCH_UP
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows has no termios; msvcrt reads single keys there
+    termios = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class KeyReader:
+    """Feeds stdin keystrokes into an asyncio.Queue
+
+    stdin is watched with loop.add_reader where the loop supports it.
+    Windows' proactor loop does not, so a thread reads keys there instead
+    (single keys via msvcrt from a console) and hands them to the loop.
+    """
+
+    def __init__(self, loop, stream=None):
+        self.loop = loop
+        self.stream = stream if stream is not None else sys.stdin
+        self.fd = self.stream.fileno()
+        self.keys = asyncio.Queue()
+        self._saved_mode = None
+        self._watching = False
+
+    def __enter__(self):
+        if termios is not None and os.isatty(self.fd):
+            self._saved_mode = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+        try:
+            self.loop.add_reader(self.fd, self._on_readable)
+            self._watching = True
+        except NotImplementedError:
+            # Daemonic: a thread blocked on a read cannot be stopped cleanly
+            threading.Thread(target=self._read_keys, name="key-reader", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._watching:
+            self.loop.remove_reader(self.fd)
+            self._watching = False
+        if self._saved_mode is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._saved_mode)
+
+    def _on_readable(self):
+        data = os.read(self.fd, 1024)
+        if not data:
+            self.loop.remove_reader(self.fd)
+            self._watching = False
+        self._put(data.decode("utf-8", "replace"))
+
+    def _read_keys(self):
+        console = msvcrt is not None and os.isatty(self.fd)
+        while True:
+            if console:
+                chars = msvcrt.getwch()
+                if chars in ("\x00", "\xe0"):
+                    msvcrt.getwch()  # second half of an arrow or function key
+                    continue
+            else:
+                chars = os.read(self.fd, 1024).decode("utf-8", "replace")
+            try:
+                self.loop.call_soon_threadsafe(self._put, chars)
+            except RuntimeError:
+                return  # the loop has closed
+            if not chars:
+                return
+
+    def _put(self, chars):
+        if not chars:
+            self.keys.put_nowait(None)  # end of input
+            return
+        for key in chars:
+            self.keys.put_nowait(key)
+
+    async def key(self):
+        """Next key, or None once stdin is closed"""
+        return await self.keys.get()
+
+    async def line(self, prompt=""):
+        """Read a line with local echo, since cbreak mode turns echo off"""
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        chars = []
+        while True:
+            key = await self.key()
+            if key is None:
+                raise EOFError
+            if key in "\r\n":
+                sys.stdout.write("\n")
+                return "".join(chars)
+            if key in "\x7f\b":
+                if chars:
+                    chars.pop()
+                    sys.stdout.write("\b \b")
+            else:
+                chars.append(key)
+                sys.stdout.write(key)
+            sys.stdout.flush()
+
+
+async def read_argument(app, reader, choice):
+    """Async counterpart of SimpleAutoScrollApp.read_argument"""
+    if choice == 't':
+        print(TEXT_PROMPT)
+        lines = []
+        while True:
+            line = await reader.line()
+            if line == "" and len(lines) > 0 and lines[-1] == "":
+                break
+            lines.append(line)
+        return "\n".join(lines[:-1])
+    if choice == 'l':
+        app.print_library()
+    if choice in ARGUMENT_PROMPTS:
+        return await reader.line(ARGUMENT_PROMPTS[choice])
+    return None
+
+
+async def run_session(app, path=None):
+    """Run the reader with the tick loop and key handling on one event loop"""
+    loop = asyncio.get_running_loop()
+    ticker = loop.create_task(app.engine.run())
+    try:
+        print("🚀 AutoScroll Text Reader - asyncio Edition")
+        print("=" * 50)
+        app.load_initial(path)
+        app.print_menu()
+        with KeyReader(loop) as reader:
+            while app.running:
+                key = await reader.key()
+                if key is None:
+                    print("\n👋 Goodbye!")
+                    break
+                choice = key.lower()
+                if choice.isspace():
+                    continue
+                try:
+                    app.handle_command(choice, await read_argument(app, reader, choice))
+                except EOFError:
+                    break
+                except Exception as e:
+                    print(f"❌ Error: {e}")
+    finally:
+        app.shutdown()
+        await ticker
+
+
+def run_async(path=None, tick_policy=CATCH_UP, compact_text=False, record=None, markdown=False):
+    """Entry point for `main.py --async`"""
+    from .cli import start_recording
+
+    app = SimpleAutoScrollApp(tick_policy, engine_class=AsyncScrollEngine, compact_text=compact_text,
+                              markdown=markdown)
+    start_recording(app, record)
+    try:
+        asyncio.run(run_session(app, path))
+    except KeyboardInterrupt:
+        print("\n👋 Goodbye!")
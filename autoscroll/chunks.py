@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Paragraph chunking for the Kivy reader
+Documents are split into small chunks so only the ones near the viewport get textures
+"""
+
+import math
+import re
+
+from .richtext import FENCE
+
+# Upper bound for one chunk; keeps every texture far below GPU size limits
+MAX_CHUNK_CHARS = 2000
+# Text prepared before anything is shown when loading in pieces: about a screenful
+FIRST_PIECE_CHARS = 4000
+# Text per later piece
+PIECE_CHARS = 64000
+
+FENCE_LINE = re.compile("^" + FENCE.pattern, re.MULTILINE)
+
+# Rough glyph metrics relative to the font size, used before a chunk is measured
+CHAR_WIDTH_RATIO = 0.5
+LINE_HEIGHT_RATIO = 1.2
+
+
+def split_chunks(text, max_chars=MAX_CHUNK_CHARS):
+    """Split text into paragraphs, cutting long ones at line breaks or spaces"""
+    return [text[start:end] for start, end in chunk_ranges(text, max_chars)]
+
+
+def chunk_ranges(text, max_chars=MAX_CHUNK_CHARS):
+    """(start, end) offsets of the chunks split_chunks() returns"""
+    ranges = []
+    length = len(text)
+    position = 0
+    while position <= length:
+        stop = text.find("\n\n", position)
+        if stop < 0:
+            stop = length
+        start = position
+        while stop - start > max_chars:
+            cut = text.rfind("\n", start, start + max_chars)
+            if cut <= start:
+                cut = text.rfind(" ", start, start + max_chars)
+            if cut <= start:
+                cut = start + max_chars
+            ranges.append((start, cut))
+            start = cut
+            while start < stop and text[start] in "\n ":
+                start += 1
+        if text[start:stop].strip():
+            ranges.append((start, stop))
+        position = stop + 2
+    return ranges
+
+
+def text_pieces(text, first_chars=FIRST_PIECE_CHARS, piece_chars=PIECE_CHARS):
+    """Cut text at blank lines outside code fences: a screenful, then larger pieces
+
+    Markdown and chunking both restart after such a line, so the pieces
+    parse and chunk one at a time like the whole text would.
+    """
+    length = len(text)
+    start = 0
+    target = first_chars
+    while start < length:
+        stop = _paragraph_break(text, start, target)
+        yield text[start:stop]
+        start = stop
+        target = stop + piece_chars
+
+
+def _paragraph_break(text, start, target):
+    """End of the first blank line outside a fence at or after `target`"""
+    length = len(text)
+    stop = start
+    fenced = False
+    while True:
+        cut = text.find("\n\n", max(target, stop))
+        if cut < 0:
+            return length
+        # chunk_ranges() pairs up a run of newlines from its start
+        while cut > stop and text[cut - 1] == "\n":
+            cut -= 1
+        cut += 2
+        fenced ^= len(FENCE_LINE.findall(text, stop, cut)) % 2 == 1
+        if not fenced and not FENCE_LINE.match(text, text.rfind("\n", 0, cut - 2) + 1):
+            return cut
+        # A fence line renders as nothing, joining the newlines around it, so
+        # neither this run of newlines nor one inside a fence is cut
+        while cut < length and text[cut] == "\n":
+            cut += 1
+        stop = target = cut
+
+
+def estimate_height(chunk, width, font_size):
+    """Approximate pixel height of a wrapped chunk before it is rendered"""
+    chars_per_line = max(1, int(width / (font_size * CHAR_WIDTH_RATIO)))
+    lines = sum(max(1, math.ceil(len(line) / chars_per_line)) for line in chunk.split("\n"))
+    return lines * font_size * LINE_HEIGHT_RATIO
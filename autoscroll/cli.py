@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Command line entry point for the AutoScroll text reader
+Front ends and optional features are imported only when selected
+"""
+
+from .app import SimpleAutoScrollApp, SAMPLE_TEXT
+from .scheduler import CATCH_UP, POLICIES
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AutoScroll Text Reader")
+    parser.add_argument("paths", nargs="*", metavar="path",
+                        help="text file to open (memory-mapped); --serve serves every file given")
+    parser.add_argument("--async", dest="async_mode", action="store_true",
+                        help="single-threaded asyncio mode with single-key commands")
+    parser.add_argument("--tick-policy", choices=POLICIES, default=CATCH_UP,
+                        help="how missed scroll ticks are handled")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep loaded non-ASCII text as UTF-8 bytes to save memory")
+    parser.add_argument("--markdown", action="store_true",
+                        help="render pasted text and the sample as Markdown (.md files always are)")
+    parser.add_argument("--prerender", nargs="?", type=int, const=8, default=0, metavar="FRAMES",
+                        help="compose upcoming frames on a background thread")
+    parser.add_argument("--serve", metavar="[HOST:]PORT",
+                        help="serve independent scroll sessions over TCP and WebSocket")
+    sync = parser.add_mutually_exclusive_group()
+    sync.add_argument("--lead", metavar="[HOST:]PORT",
+                      help="send this reader's scroll position to followers over UDP")
+    sync.add_argument("--follow", metavar="HOST:PORT",
+                      help="mirror the scroll position of a leader")
+    parser.add_argument("--record", metavar="FILE",
+                        help="log this session's commands so --replay can reproduce its frames")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="re-run a recorded session under a virtual clock and check its frames")
+    parser.add_argument("--speedup", type=float, default=0.0, metavar="N",
+                        help="replay at N times real time (default: as fast as possible)")
+    parser.add_argument("--show", action="store_true",
+                        help="draw the frames while replaying")
+    parser.add_argument("--profile", nargs="?", const="autoscroll-profile", metavar="DIR",
+                        help="record phase timings, cProfile and tracemalloc output into DIR")
+    args = parser.parse_args(argv)
+    args.path = args.paths[0] if args.paths else None
+    return args
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    
+    # Check if running on Android
+    from .device import is_android
+    if is_android():
+        print("📱 Running on Android device")
+    else:
+        print("💻 Running on desktop/Termux")
+    
+    if args.profile:
+        from .instrumentation import profile_session
+        profile_session(lambda: run(args), args.profile)
+    else:
+        run(args)
+
+
+def run(args):
+    """Run the selected front end until the user quits"""
+    if args.serve:
+        from .server import serve
+        serve(args.paths, args.serve, SAMPLE_TEXT)
+        return
+    if args.replay:
+        from .replay import replay
+        if not replay(args.replay, args.speedup, args.show):
+            raise SystemExit(1)
+        return
+    if args.async_mode and (args.lead or args.follow):
+        # Sync packets arrive on their own thread, which needs the threaded engine
+        print("⚠️ --lead/--follow use the threaded engine; ignoring --async")
+    elif args.async_mode:
+        from .async_console import run_async
+        run_async(args.path, args.tick_policy, args.compact, args.record, args.markdown)
+        return
+    
+    app = SimpleAutoScrollApp(args.tick_policy, compact_text=args.compact, prerender=args.prerender,
+                              markdown=args.markdown)
+    try:
+        start_sync(app, args)
+        start_recording(app, args.record)
+        app.run_interactive(args.path)
+    finally:
+        app.shutdown()
+
+
+def start_sync(app, args):
+    """Attach a sync leader or follower to the app if one was requested"""
+    if not (args.lead or args.follow):
+        return
+    from .sync import SyncLeader, SyncFollower
+    
+    if args.lead:
+        app.sync = SyncLeader(app, args.lead)
+    else:
+        app.sync = SyncFollower(app, args.follow)
+    app.sync.start()
+
+
+def start_recording(app, path):
+    """Log the session's commands to `path` if --record was given"""
+    if not path:
+        return
+    from .replay import SessionRecorder
+
+    app.recorder = SessionRecorder(app, path)
+
+
+def first_frame(stream):
+    """Build the app and draw the sample text once; used by the startup check"""
+    from .renderer import TerminalRenderer
+
+    app = SimpleAutoScrollApp()
+    try:
+        app.renderer = TerminalRenderer(stream, ansi=True)
+        app.load_text(SAMPLE_TEXT)
+        app.engine.submit(app.render_frame, wait=True)
+    finally:
+        app.shutdown()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Streaming decompression for the AutoScroll text reader
+gzip/bz2/xz documents are decoded page by page as the reader advances
+"""
+
+import bz2
+import lzma
+import os
+import zlib
+from collections import OrderedDict
+
+# Uncompressed bytes per decoded page
+PAGE_SIZE = 1 << 20
+# Compressed bytes read from the file per decompressor call
+READ_SIZE = 64 * 1024
+# Decoded pages kept in memory
+CACHE_PAGES = 8
+# Pages between checkpoints of the decompressor state (gzip only)
+CHECKPOINT_PAGES = 32
+
+SUFFIXES = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".lzma": "xz",
+}
+
+
+def compression_of(path):
+    """Compression format implied by a file name, or None"""
+    lower = path.lower()
+    for suffix, kind in SUFFIXES.items():
+        if lower.endswith(suffix):
+            return kind
+    return None
+
+
+def _decompressor(kind):
+    if kind == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if kind == "bz2":
+        return bz2.BZ2Decompressor()
+    return lzma.LZMADecompressor()
+
+
+class _Cursor:
+    """A decoder positioned at the start of a page"""
+
+    def __init__(self, kind, file, page, offset, decompressor, tail=b""):
+        self.kind = kind
+        self.file = file
+        self.page = page
+        self.offset = offset  # compressed bytes consumed from the file
+        self.decompressor = decompressor
+        self.tail = tail  # compressed input handed over but not consumed yet
+        self.eof = False
+
+    def next_page(self):
+        """Decode exactly one page (shorter only at the end of the stream)"""
+        out = bytearray()
+        d = self.decompressor
+        while len(out) < PAGE_SIZE and not self.eof:
+            want = PAGE_SIZE - len(out)
+            if self.kind == "gzip":
+                data = self.tail or self._read()
+                if not data and not d.unconsumed_tail:
+                    self.eof = True
+                    break
+                out += d.decompress(data, want)
+                self.tail = d.unconsumed_tail
+                if d.eof:
+                    # Concatenated gzip members continue in unused_data
+                    # (unconsumed_tail repeats the same bytes once eof is set)
+                    rest = d.unused_data
+                    d = self.decompressor = _decompressor(self.kind)
+                    self.tail = rest
+            else:
+                if d.eof:
+                    rest = d.unused_data
+                    if not rest:
+                        rest = self._read()
+                        if not rest:
+                            self.eof = True
+                            break
+                    d = self.decompressor = _decompressor(self.kind)
+                    self.tail = rest
+                data = b""
+                if d.needs_input:
+                    data = self.tail or self._read()
+                    self.tail = b""
+                    if not data:
+                        self.eof = True
+                        break
+                out += d.decompress(data, want)
+        self.page += 1
+        return bytes(out)
+
+    def _read(self):
+        self.file.seek(self.offset)
+        data = self.file.read(READ_SIZE)
+        self.offset += len(data)
+        return data
+
+    def checkpoint(self):
+        """Snapshot to restart decoding at this page later (gzip only)"""
+        if self.kind != "gzip":
+            return None
+        return self.page, self.offset, self.decompressor.copy(), self.tail
+
+
+class CompressedText:
+    """Compressed UTF-8 file that slices like a string, decoded on demand
+
+    Positions are byte offsets into the uncompressed stream. Only the
+    decoded prefix exists: len() grows as read_more() decodes further
+    pages and `complete` turns True at the end of the stream. Old pages
+    are re-decoded from the nearest checkpoint (gzip) or from the start
+    (bz2/xz, whose decompressors cannot be snapshotted).
+    """
+
+    streaming = True
+
+    def __init__(self, path, kind=None):
+        self.path = path
+        self.kind = kind or compression_of(path) or "gzip"
+        self._file = open(path, "rb")
+        self.compressed_size = os.fstat(self._file.fileno()).st_size
+        self._frontier = _Cursor(self.kind, self._file, 0, 0, _decompressor(self.kind))
+        self._checkpoints = [self._frontier.checkpoint() or (0, 0, None, b"")]
+        self._pages = OrderedDict()
+        self._reader = None
+        self.pages_decoded = 0
+        self.length = 0
+        self.complete = False
+
+    def __len__(self):
+        return self.length
+
+    def __bool__(self):
+        return self.length > 0 or not self.complete
+
+    def read_more(self):
+        """Decode the next page at the frontier; b'' once the stream ends"""
+        if self.complete:
+            return b""
+        page_no = self._frontier.page
+        if page_no and page_no % CHECKPOINT_PAGES == 0:
+            checkpoint = self._frontier.checkpoint()
+            if checkpoint is not None:
+                self._checkpoints.append(checkpoint)
+        page = self._frontier.next_page()
+        self.pages_decoded += 1
+        if len(page) < PAGE_SIZE:
+            self.complete = True
+        self.length += len(page)
+        if page:
+            self._remember(page_no, page)
+        return page
+
+    def estimated_length(self):
+        """Uncompressed length of the whole stream: exact once complete,
+        else extrapolated from the share of the file decoded so far"""
+        consumed = self._frontier.offset - len(self._frontier.tail)
+        if self.complete or consumed <= 0:
+            return self.length
+        return max(self.length, self.length * self.compressed_size // consumed)
+
+    def iter_chunks(self, size=None):
+        """Yield the pages that have been decoded so far"""
+        for page_no in range((self.length + PAGE_SIZE - 1) // PAGE_SIZE):
+            yield self._page(page_no)
+
+    def _remember(self, page_no, page):
+        self._pages[page_no] = page
+        self._pages.move_to_end(page_no)
+        while len(self._pages) > CACHE_PAGES:
+            self._pages.popitem(last=False)
+
+    def _page(self, page_no):
+        page = self._pages.get(page_no)
+        if page is not None:
+            self._pages.move_to_end(page_no)
+            return page
+        reader = self._reader
+        if reader is None or reader.page > page_no:
+            reader = self._reader = self._restore(page_no)
+        while reader.page < page_no:
+            reader.next_page()
+        page = reader.next_page()
+        self._remember(page_no, page)
+        return page
+
+    def _restore(self, page_no):
+        """Fresh cursor at the last checkpoint at or before a page"""
+        best = self._checkpoints[0]
+        for checkpoint in self._checkpoints:
+            if checkpoint[0] <= page_no:
+                best = checkpoint
+        page, offset, decompressor, tail = best
+        if decompressor is None:
+            return _Cursor(self.kind, self._file, 0, 0, _decompressor(self.kind))
+        return _Cursor(self.kind, self._file, page, offset, decompressor.copy(), tail)
+
+    def raw(self, start, stop):
+        """Raw bytes of a range of the uncompressed stream"""
+        parts = []
+        pos = start
+        while pos < stop:
+            page_no, inner = divmod(pos, PAGE_SIZE)
+            page = self._page(page_no)
+            piece = page[inner:inner + (stop - pos)]
+            if not piece:
+                break
+            parts.append(piece)
+            pos += len(piece)
+        return b"".join(parts)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1]
+        start, stop, _ = key.indices(self.length)
+        if start >= stop:
+            return ""
+        # Widen by up to 3 bytes so characters split at the edges are dropped cleanly
+        data = self.raw(start, min(stop + 3, self.length))
+        skip = 0
+        while skip < len(data) and data[skip] & 0xC0 == 0x80:
+            skip += 1
+        end = stop - start
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end += 1
+        return data[skip:end].decode("utf-8", "replace")
+
+    def close(self):
+        self._pages.clear()
+        self._checkpoints = self._checkpoints[:1]
+        self._reader = None
+        self._file.close()
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Platform probes for the AutoScroll text reader
+Answered from the environment first so desktop starts never import android
+"""
+
+import os
+
+_android = None
+
+
+def is_android():
+    """True when running inside a python-for-android build"""
+    global _android
+    if _android is None:
+        if "ANDROID_ARGUMENT" in os.environ or "ANDROID_PRIVATE" in os.environ:
+            _android = True
+        elif "ANDROID_ROOT" not in os.environ:
+            _android = False  # not an Android kernel at all
+        else:
+            # Termux also sets ANDROID_ROOT; only p4a builds ship the module
+            from importlib.util import find_spec
+            _android = find_spec("android") is not None
+    return _android
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Persistent scroll engine for the AutoScroll text reader
+One long-lived worker thread owns all scrolling state and is driven by commands
+"""
+
+import threading
+import time
+from collections import deque
+
+from .instrumentation import STATS, start_thread_profile
+from .scheduler import TickScheduler, CATCH_UP
+
+
+class EngineStopped(RuntimeError):
+    """Raised when a command is sent to an engine that was shut down"""
+
+
+class ScrollEngine:
+    """Single worker thread that runs commands and scroll ticks in order
+
+    Commands are callables queued with submit() and executed on the worker,
+    so state changes never race with a tick. The worker waits on a
+    Condition instead of sleeping, which lets a pause, reset or speed change
+    interrupt a long tick interval immediately.
+    """
+
+    def __init__(self, tick, interval=1.0, policy=CATCH_UP, name="scroll-engine"):
+        self._tick = tick
+        self.scheduler = TickScheduler(interval, policy)
+        self.scrolling = False
+        self._commands = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.start()
+
+    def submit(self, command, wait=False):
+        """Queue a callable to run on the engine thread"""
+        done = threading.Event() if wait else None
+        with self._cond:
+            if self._stopped:
+                raise EngineStopped("Scroll engine has been shut down")
+            self._commands.append((command, done))
+            self._cond.notify()
+        if done is not None and threading.current_thread() is not self._thread:
+            done.wait()
+
+    def start(self):
+        """Begin ticking (called on the engine thread)"""
+        if not self.scrolling:
+            self.scrolling = True
+            self.scheduler.start()
+
+    def stop(self):
+        """Stop ticking (called on the engine thread)"""
+        self.scrolling = False
+
+    def set_interval(self, interval):
+        """Change the tick period (called on the engine thread)"""
+        self.scheduler.set_interval(interval)
+
+    def shutdown(self, timeout=None):
+        """Stop the worker after the queued commands have run"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def alive(self):
+        return self._thread.is_alive()
+
+    def _next_commands(self):
+        """Block until commands arrive, a tick is due or shutdown is requested"""
+        with self._cond:
+            while not self._commands and not self._stopped:
+                if not self.scrolling:
+                    self._cond.wait()
+                    continue
+                delay = self.scheduler.remaining()
+                if delay <= 0:
+                    break
+                if STATS.enabled:
+                    waited = time.perf_counter()
+                    self._cond.wait(delay)
+                    STATS.record("sleep", time.perf_counter() - waited)
+                else:
+                    self._cond.wait(delay)
+            commands = list(self._commands)
+            self._commands.clear()
+            return commands, self._stopped
+
+    def _run(self):
+        profiler = start_thread_profile()
+        try:
+            self._loop()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+    def _loop(self):
+        while True:
+            commands, stopped = self._next_commands()
+            for command, done in commands:
+                try:
+                    command()
+                except Exception as e:
+                    print(f"❌ Engine error: {e}")
+                finally:
+                    if done is not None:
+                        done.set()
+            if stopped:
+                return
+            if commands or not self.scrolling:
+                continue  # re-check the deadline after state changes
+
+            due = self.scheduler.take()
+            try:
+                keep_going = self._tick(due)
+            except Exception as e:
+                print(f"❌ Engine error: {e}")
+                keep_going = False
+            if not keep_going:
+                self.scrolling = False
+
+
+class AsyncScrollEngine:
+    """Same command interface as ScrollEngine, run as a task on an asyncio loop
+
+    Everything happens on the loop's thread: submit() runs the command right
+    away and wakes the tick task so it can recompute its next deadline.
+    """
+
+    def __init__(self, tick, interval=1.0, policy=CATCH_UP, name="scroll-engine"):
+        self._tick = tick
+        self.scheduler = TickScheduler(interval, policy)
+        self.scrolling = False
+        self._wake = None
+        self._stopped = False
+
+    def submit(self, command, wait=False):
+        """Run a command now; `wait` is accepted for interface compatibility"""
+        if self._stopped:
+            raise EngineStopped("Scroll engine has been shut down")
+        command()
+        self._notify()
+
+    def start(self):
+        if not self.scrolling:
+            self.scrolling = True
+            self.scheduler.start()
+
+    def stop(self):
+        self.scrolling = False
+
+    def set_interval(self, interval):
+        self.scheduler.set_interval(interval)
+
+    def shutdown(self, timeout=None):
+        self._stopped = True
+        self._notify()
+
+    @property
+    def alive(self):
+        return not self._stopped
+
+    def step(self):
+        """Wait for the next deadline and run one tick without an event loop
+
+        Used by drivers that supply their own clock, such as the benchmarks.
+        """
+        if not self.scrolling:
+            return False
+        due = self.scheduler.wait()
+        if not self._tick(due):
+            self.scrolling = False
+        return self.scrolling
+
+    def _notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self):
+        """Tick loop; await it as a task on the running event loop"""
+        import asyncio
+
+        self._wake = asyncio.Event()
+        while not self._stopped:
+            self._wake.clear()
+            if not self.scrolling:
+                await self._wake.wait()
+                continue
+            delay = self.scheduler.remaining()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = self.scheduler.take()
+            try:
+                keep_going = self._tick(due)
+            except Exception as e:
+                print(f"❌ Engine error: {e}")
+                keep_going = False
+            if not keep_going:
+                self.scrolling = False
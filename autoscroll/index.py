@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Offset index for the AutoScroll text reader
+Line starts and terminal-width wrapped rows for O(log n) seeking
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+
+from .search import SearchIndex
+from .source import MappedText, iter_chunks
+
+NEWLINE = {str: re.compile("\n"), bytes: re.compile(b"\n")}
+# Greedy, so a match ends at the last word start of the text it is matched to
+LAST_WORD_START = {str: re.compile(r".*\s(?=\S)", re.S), bytes: re.compile(rb".*\s(?=\S)", re.S)}
+
+# Lines are wrapped in blocks so a resize only rewraps the blocks on screen
+BLOCK_LINES = 256
+# Mapped files from this size up are indexed on a process pool
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+# Smaller mapped files index faster than a sidecar is validated and mapped
+SIDECAR_MIN_SIZE = 16 * 1024 * 1024
+
+
+class TextIndex:
+    """Line and wrapped-row offsets for a loaded text
+
+    Offsets are in the text's own units: characters for a str, bytes for a
+    file-backed text. Line starts are computed once; wrapped rows are derived
+    from them per block of lines and recomputed lazily when the width
+    changes, finding word breaks in the rows' own text. Only line starts are
+    kept for the whole text. Unless disabled, a SearchIndex is fed the same
+    chunks.
+    """
+
+    def __init__(self, width=80, search=True):
+        self.line_starts = array("Q", [0])
+        self.length = 0
+        self.width = max(1, width)
+        # The indexed text, read while wrapping; set by build()
+        self.text = None
+        self._blocks = [None]
+        self.search = SearchIndex() if search else None
+        # ParallelIndexBuild still filling this index, if any
+        self.builder = None
+
+    @classmethod
+    def build(cls, text, width=80, chunk_size=1 << 20, search=True, background=False):
+        """Index a whole text in one pass
+
+        Large mapped files are indexed in parallel. With `background`, the
+        index is returned once their first chunk is done and `builder` is
+        left to merge the rest (see ParallelIndexBuild). Their offsets are
+        saved to a sidecar file once complete and mapped from it next time.
+        """
+        saved = None
+        if isinstance(text, MappedText) and len(text) >= SIDECAR_MIN_SIZE:
+            from . import sidecar
+
+            text_stamp = sidecar.stamp(text)
+            index = sidecar.load(text, text_stamp, width, search)
+            if index is not None:
+                index.text = text
+                return index
+            saved = lambda index: sidecar.save_later(text.path, text_stamp, index)
+        index = cls(width, search)
+        index.text = text
+        if isinstance(text, MappedText) and len(text) >= PARALLEL_THRESHOLD:
+            from .parallel import ParallelIndexBuild
+
+            builder = ParallelIndexBuild(text, index, finished=saved)
+            if not background:
+                builder.finish()
+            return index
+        if getattr(text, "streaming", False) and not len(text):
+            text.read_more()  # streaming texts are indexed as they decode
+        for chunk in iter_chunks(text, chunk_size):
+            index.feed(chunk)
+        if saved is not None:
+            saved(index)
+        return index
+
+    def feed(self, data):
+        """Append the next chunk of text to the index"""
+        if not data:
+            return
+        base = self.length
+        kind = bytes if isinstance(data, (bytes, bytearray)) else str
+        lines = self.line_starts
+        for match in NEWLINE[kind].finditer(data):
+            lines.append(base + match.end())
+        self.length += len(data)
+        if self.search is not None:
+            self.search.feed(data)
+        self._dirty()
+
+    def extend(self, length, line_starts):
+        """Append line starts computed elsewhere for the text up to `length`
+
+        The offsets must start past the current length.
+        """
+        self.line_starts.extend(line_starts)
+        self.length = length
+        self._dirty()
+
+    def _dirty(self):
+        # The last block may have grown, so drop it along with any new ones
+        first_dirty = min(len(self._blocks), self.block_count()) - 1
+        self._blocks[first_dirty:] = [None] * (self.block_count() - first_dirty)
+
+    def block_count(self):
+        return (len(self.line_starts) + BLOCK_LINES - 1) // BLOCK_LINES
+
+    def line_count(self):
+        return len(self.line_starts)
+
+    def line_of(self, pos):
+        """Line number (0-based) containing a position"""
+        return bisect_right(self.line_starts, pos) - 1
+
+    def line_start(self, line):
+        line = max(0, min(line, len(self.line_starts) - 1))
+        return self.line_starts[line]
+
+    def position_at_percent(self, percent):
+        """Start of the row found at a percentage of the text"""
+        percent = max(0.0, min(100.0, percent))
+        return self.row_start(int(self.length * percent / 100))
+
+    def set_width(self, width):
+        """Change the wrap width; blocks are rewrapped when next visited"""
+        width = max(1, width)
+        if width != self.width:
+            self.width = width
+            self._blocks = [None] * self.block_count()
+
+    def rewrapped(self, width):
+        """Index sharing these line offsets, wrapped at another width
+
+        The offset arrays are shared, so only a complete index should be
+        rewrapped and neither copy fed afterwards.
+        """
+        import copy
+
+        view = copy.copy(self)
+        view.width = max(1, width)
+        view._blocks = [None] * self.block_count()
+        view.search = None
+        view.builder = None
+        return view
+
+    def _line_end(self, line):
+        if line + 1 < len(self.line_starts):
+            return self.line_starts[line + 1] - 1  # exclude the newline
+        return self.length
+
+    def _wrap_line(self, line, rows):
+        """Append the row starts of one line, breaking at word starts"""
+        pos = self.line_starts[line]
+        end = self._line_end(line)
+        width = self.width
+        raw = getattr(self.text, "raw", None)  # byte offsets need undecoded bytes
+        rows.append(pos)
+        while end - pos > width:
+            limit = pos + width
+            # The last word starting after pos and by limit begins the next row
+            row = raw(pos, limit + 1) if raw is not None else self.text[pos:limit + 1]
+            match = LAST_WORD_START[bytes if raw is not None else str].match(row)
+            nxt = pos + match.end() if match else limit  # else a word wider than the screen
+            rows.append(nxt)
+            pos = nxt
+
+    def _block(self, block):
+        rows = self._blocks[block]
+        if rows is None:
+            rows = array("Q")
+            first = block * BLOCK_LINES
+            for line in range(first, min(first + BLOCK_LINES, len(self.line_starts))):
+                self._wrap_line(line, rows)
+            self._blocks[block] = rows
+        return rows
+
+    def _locate(self, pos):
+        """Block number and row number within the block for a position"""
+        pos = max(0, min(pos, self.length))
+        block = self.line_of(pos) // BLOCK_LINES
+        rows = self._block(block)
+        return block, bisect_right(rows, pos) - 1
+
+    def row_start(self, pos):
+        """Start of the display row containing a position"""
+        block, row = self._locate(pos)
+        return self._block(block)[row]
+
+    def advance(self, pos, count):
+        """Position of the row `count` display rows away (may be negative)"""
+        block, row = self._locate(pos)
+        row += count
+        while row < 0:
+            if block == 0:
+                return 0
+            block -= 1
+            row += len(self._block(block))
+        while row >= len(self._block(block)):
+            if block + 1 >= self.block_count():
+                rows = self._block(block)
+                return rows[-1]
+            row -= len(self._block(block))
+            block += 1
+        return self._block(block)[row]
+
+    def rows(self, pos, count):
+        """(start, end) offsets of up to `count` rows from a position"""
+        block, row = self._locate(pos)
+        result = []
+        rows = self._block(block)
+        while len(result) < count:
+            if row + 1 < len(rows):
+                end = rows[row + 1]
+            elif block + 1 < self.block_count():
+                end = self._block(block + 1)[0]
+            else:
+                result.append((rows[row], self.length))
+                break
+            result.append((rows[row], end))
+            row += 1
+            if row >= len(rows):
+                block += 1
+                row = 0
+                rows = self._block(block)
+        return result
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Hot-path instrumentation for the AutoScroll text reader
+Per-phase timers in fixed-size histograms, plus an opt-in cProfile/tracemalloc session
+
+Call sites guard every measurement with `if STATS.enabled:` so the cost
+when instrumentation is off is a single attribute check.
+"""
+
+import os
+import threading
+import time
+
+# Bucket i counts durations below 2**i microseconds; the last bucket is open-ended
+BUCKETS = 32
+
+
+class Histogram:
+    """Fixed-size log2 histogram of durations"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        micros = int(seconds * 1_000_000)
+        self.counts[min(micros.bit_length(), BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """Upper bound in milliseconds of the bucket holding the p-th percentile"""
+        if not self.count:
+            return 0.0
+        target = p / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(2 ** bucket / 1000, self.max * 1000)
+        return self.max * 1000
+
+
+class Stats:
+    """Named phase histograms and counters"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase, seconds):
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            with self._lock:
+                histogram = self.phases.setdefault(phase, Histogram())
+        histogram.add(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.phases = {}
+            self.counters = {}
+
+    def report(self):
+        """Table of phase timings and counters"""
+        if not self.enabled:
+            return "ℹ️ Instrumentation is off (start with --profile)"
+        lines = [f"{'phase':<14}{'count':>9}{'total ms':>11}{'mean ms':>10}{'p50 ≤':>9}{'p99 ≤':>9}{'max ms':>9}"]
+        for name, h in sorted(self.phases.items()):
+            mean = h.total / h.count * 1000 if h.count else 0.0
+            lines.append(f"{name:<14}{h.count:>9}{h.total * 1000:>11.2f}{mean:>10.3f}"
+                         f"{h.percentile(50):>9.3f}{h.percentile(99):>9.3f}{h.max * 1000:>9.3f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<14}{value:>9}")
+        return "\n".join(lines)
+
+
+STATS = Stats()
+
+# Profilers of every thread that ran during a --profile session
+_profilers = []
+_profiling = False
+
+
+def start_thread_profile():
+    """Profile the calling thread if a session is active; returns the profiler or None"""
+    if not _profiling:
+        return None
+    import cProfile
+    profiler = cProfile.Profile()
+    _profilers.append(profiler)
+    profiler.enable()
+    return profiler
+
+
+def profile_session(run, out_dir):
+    """Run `run()` under cProfile and tracemalloc and write the results to out_dir"""
+    global _profiling
+    import io
+    import pstats
+    import tracemalloc
+
+    os.makedirs(out_dir, exist_ok=True)
+    STATS.enabled = True
+    _profiling = True
+    tracemalloc.start(10)
+    before = tracemalloc.take_snapshot()
+    profiler = start_thread_profile()
+    started = time.perf_counter()
+    try:
+        return run()
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        _profiling = False
+
+        combined = pstats.Stats(profiler)
+        for other in _profilers:
+            if other is not profiler:
+                other.disable()
+                combined.add(other)
+        combined.dump_stats(os.path.join(out_dir, "profile.pstats"))
+        text = io.StringIO()
+        combined.stream = text
+        combined.sort_stats("cumulative").print_stats(40)
+        with open(os.path.join(out_dir, "profile.txt"), "w") as f:
+            f.write(text.getvalue())
+
+        with open(os.path.join(out_dir, "tracemalloc.txt"), "w") as f:
+            f.write(f"current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n\n")
+            for stat in after.compare_to(before, "lineno")[:25]:
+                f.write(f"{stat}\n")
+
+        with open(os.path.join(out_dir, "stats.txt"), "w") as f:
+            f.write(f"session {elapsed:.2f} s\n\n{STATS.report()}\n")
+        _profilers.clear()
+        print(f"📈 Profile written to {out_dir}")
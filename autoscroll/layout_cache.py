@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Width-keyed LRU cache of wrapped text layouts
+Rotating or reopening a document reuses the chunk heights measured last time
+"""
+
+import hashlib
+from array import array
+from collections import OrderedDict
+
+# Default memory cap for all cached layouts
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+# Bookkeeping cost per entry on top of the height array itself
+ENTRY_OVERHEAD = 200
+
+
+def document_hash(text):
+    """Short content hash used as the document part of a layout key"""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class LayoutCache:
+    """LRU map of (document hash, width, font settings) -> chunk heights"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(doc_hash, width, font):
+        return doc_hash, int(width), font
+
+    def get(self, key):
+        """Cached heights for a layout, or None"""
+        heights = self._entries.get(key)
+        if heights is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return heights
+
+    def put(self, key, heights):
+        """Store (or replace) the heights of a layout and evict to the cap"""
+        heights = heights if isinstance(heights, array) else array("f", heights)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= self._size(old)
+        self._entries[key] = heights
+        self.bytes += self._size(heights)
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= self._size(evicted)
+            self.evictions += 1
+        return heights
+
+    @staticmethod
+    def _size(heights):
+        return heights.itemsize * len(heights) + ENTRY_OVERHEAD
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return (f"📐 Layout cache: {self.hit_rate():.0%} hits ({self.hits}/{self.hits + self.misses}), "
+                f"{len(self._entries)} layouts, {self.bytes / 1024:.1f} KiB of {self.max_bytes / 1024:.0f} KiB, "
+                f"{self.evictions} evicted")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+On-disk document library for the AutoScroll text reader
+Documents, reading positions and speeds live in SQLite; recently opened
+documents stay mapped and indexed in an in-memory LRU
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .index import TextIndex
+
+# Documents kept open (mapped and indexed) for instant reopening
+DEFAULT_CACHE_SIZE = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    length INTEGER,
+    mtime REAL NOT NULL,
+    added REAL NOT NULL,
+    opened REAL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    document_id INTEGER PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    speed REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+def library_home():
+    """Directory holding the database and pasted texts"""
+    return os.environ.get("AUTOSCROLL_HOME") or os.path.join(os.path.expanduser("~"), ".autoscroll")
+
+
+class Document:
+    """An opened library document: its text source, index and saved state
+
+    `position` is the saved offset as stored; streaming texts may not have
+    decoded that far yet, so the reader clamps it once it has.
+    """
+
+    __slots__ = ("id", "path", "title", "text", "index", "position", "speed")
+
+    def __init__(self, doc_id, path, title, text, index, position, speed):
+        self.id = doc_id
+        self.path = path
+        self.title = title
+        self.text = text
+        self.index = index
+        self.position = position
+        self.speed = speed
+
+
+class Library:
+    """SQLite-backed catalogue of documents with an LRU of opened ones"""
+
+    def __init__(self, home=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.home = home or library_home()
+        os.makedirs(os.path.join(self.home, "texts"), exist_ok=True)
+        # Positions are saved from the engine thread as well as the UI thread
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(self.home, "library.db"), check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(documents)")]
+        if "length" not in columns:  # libraries created before it was recorded
+            self.db.execute("ALTER TABLE documents ADD COLUMN length INTEGER")
+        self.cache_size = cache_size
+        self._open = OrderedDict()
+        # Id of the document last returned by open(); the reader may still
+        # be showing it while the next one opens, so it is never evicted
+        self.reading = None
+
+    def add(self, path, title=None):
+        """Register a file (or refresh its metadata) and return its id"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        title = title or os.path.basename(path)
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT INTO documents (path, title, size, mtime, added) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET length = CASE WHEN size = excluded.size "
+                "AND mtime = excluded.mtime THEN length END, size = excluded.size, mtime = excluded.mtime",
+                (path, title, stat.st_size, stat.st_mtime, time.time()),
+            )
+            row = self.db.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+        return row[0]
+
+    def add_text(self, text, title=None, suffix=".txt"):
+        """Save pasted text as a library file and register it"""
+        data = text.encode("utf-8")
+        name = hashlib.blake2b(data, digest_size=8).hexdigest()
+        path = os.path.join(self.home, "texts", f"{name}{suffix}")
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        first_line = text.strip().split("\n", 1)[0][:60]
+        return self.add(path, title or first_line or name)
+
+    def documents(self):
+        """(id, title, size, length, position, opened) for every document, most recent first
+
+        `length` is the decoded length last seen when a position was saved,
+        or None if none was.
+        """
+        with self._lock:
+            return self.db.execute(
+                "SELECT d.id, d.title, d.size, d.length, COALESCE(p.position, 0), d.opened "
+                "FROM documents d LEFT JOIN positions p ON p.document_id = d.id "
+                "ORDER BY COALESCE(d.opened, d.added) DESC"
+            ).fetchall()
+
+    def open(self, doc_id, width=80, background=False):
+        """Open a document, reusing the cached mapping and index when unchanged
+
+        With `background`, a large file's index may still be filling when
+        this returns (see TextIndex.build).
+        """
+        with self._lock:
+            row = self.db.execute(
+                "SELECT d.path, d.title, d.size, d.mtime, p.position, p.speed "
+                "FROM documents d LEFT JOIN positions p ON p.document_id = d.id WHERE d.id = ?",
+                (doc_id,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"No document with id {doc_id}")
+        path, title, size, mtime, position, speed = row
+
+        cached = self._open.get(doc_id)
+        stat = os.stat(path)
+        if cached is not None and (stat.st_size, stat.st_mtime) == (size, mtime):
+            self._open.move_to_end(doc_id)
+            text, index = cached
+        else:
+            from .source import open_source
+
+            text = open_source(path)
+            index = TextIndex.build(text, width, background=background)
+            self._remember(doc_id, text, index)
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self.add(path)
+                position = 0  # the file changed under us; the old offset is meaningless
+
+        with self._lock, self.db:
+            self.db.execute("UPDATE documents SET opened = ? WHERE id = ?", (time.time(), doc_id))
+        self.reading = doc_id
+        return Document(doc_id, path, title, text, index, position or 0, speed or 1.0)
+
+    def _remember(self, doc_id, text, index):
+        self._open[doc_id] = (text, index)
+        self._open.move_to_end(doc_id)
+        while len(self._open) > self.cache_size:
+            victim = next((d for d in self._open if d not in (doc_id, self.reading)), None)
+            if victim is None:
+                break  # only the documents in use are left
+            self._release(*self._open.pop(victim))
+
+    @staticmethod
+    def _release(text, index):
+        """Stop indexing a dropped document and close its mapping"""
+        if index.builder is not None:
+            index.builder.close()
+        text.close()
+
+    def is_cached(self, doc_id):
+        return doc_id in self._open
+
+    def save_position(self, doc_id, position, speed, length=None):
+        """Persist where a document was left and at what speed
+
+        `length` is the document's length in the units of `position`, which
+        differs from its file size for compressed and Markdown files.
+        """
+        with self._lock, self.db:
+            if length is not None:
+                self.db.execute("UPDATE documents SET length = ? WHERE id = ?", (length, doc_id))
+            self.db.execute(
+                "INSERT INTO positions (document_id, position, speed, updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(document_id) DO UPDATE SET position = excluded.position, "
+                "speed = excluded.speed, updated = excluded.updated",
+                (doc_id, position, speed, time.time()),
+            )
+
+    def close(self):
+        """Release every cached document and the database"""
+        for text, index in self._open.values():
+            self._release(text, index)
+        self._open.clear()
+        with self._lock:
+            self.db.close()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Parallel indexing of large memory-mapped documents
+The file is cut at line breaks and the pieces are indexed on a process pool
+while the reader already scrolls through the first one
+"""
+
+import mmap
+import os
+import re
+import time
+from array import array
+from collections import deque
+
+from .instrumentation import STATS
+from .search import BLOCK_SIZE, OVERLAP, _grams
+
+# Indexed in-process before anything else, so the first frame need not wait for the pool
+FIRST_CHUNK = 4 * 1024 * 1024
+# Bytes per pool task; large enough that pickling results stays cheap
+CHUNK_BYTES = 32 * 1024 * 1024
+
+NEWLINE = re.compile(b"\n")
+
+
+def plan_chunks(buffer, size, first=FIRST_CHUNK, chunk=CHUNK_BYTES):
+    """(start, stop) byte ranges covering the file, each ending just after a newline
+
+    Cutting after a newline also cuts between UTF-8 characters, so the
+    pieces can be indexed independently.
+    """
+    ranges = []
+    start = 0
+    target = first
+    while start < size:
+        newline = buffer.find(b"\n", target) if target < size else -1
+        stop = newline + 1 if newline >= 0 else size
+        ranges.append((start, stop))
+        start = stop
+        target = stop + chunk
+    return ranges
+
+
+def index_range(path, start, stop, search=True):
+    """Line starts and search postings of one byte range
+
+    Runs in a pool worker: the file is mapped again there rather than
+    sent over, and the patterns scan the mapping without copying it.
+    Search blocks belong to the range their first byte falls in and are
+    read in full, past `stop` if need be, exactly as SearchIndex would.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        lines = array("Q", [match.end() for match in NEWLINE.finditer(buffer, start, stop)])
+        postings = {}
+        first_block = -(-start // BLOCK_SIZE)
+        blocks = -(-stop // BLOCK_SIZE)
+        if search:
+            size = len(buffer)
+            for number in range(first_block, blocks):
+                data = buffer[max(0, number * BLOCK_SIZE - OVERLAP):min((number + 1) * BLOCK_SIZE, size)]
+                for gram in set(_grams(data.lower())):
+                    numbers = postings.get(gram)
+                    if numbers is None:
+                        numbers = postings[gram] = array("I")
+                    numbers.append(number)
+    return stop, lines, postings, blocks
+
+
+def default_workers():
+    # One core is left for the reader itself
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class ParallelIndexBuild:
+    """Fills a TextIndex for a MappedText from pool results, in file order
+
+    The first chunk is indexed before the constructor returns; the rest are
+    queued on a process pool. Results are merged only by whoever owns the
+    index (the engine thread in the reader): merge_ready() takes what has
+    arrived without blocking, wait_for() blocks until a position is covered. While results
+    are outstanding the index's `builder` is this object, then None, and
+    `finished` (if given) is called with the complete index.
+    """
+
+    def __init__(self, text, index, workers=None, finished=None):
+        self.index = index
+        self.finished = finished
+        self.path = text.path
+        self.size = len(text)
+        self.started = time.perf_counter()
+        self.workers = workers or default_workers()
+        self._search = index.search is not None
+        self._pool = None
+        self._pending = deque()  # (future, stop) in file order
+        ranges = plan_chunks(text.buffer, self.size)
+        if len(ranges) > 1:
+            try:
+                from concurrent.futures import ProcessPoolExecutor
+                from multiprocessing import get_context
+
+                # spawn, since forking a process that runs the engine thread is unsafe
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=get_context("spawn"))
+                for start, stop in ranges[1:]:
+                    self._pending.append((self._pool.submit(index_range, self.path, start, stop, self._search), stop))
+            except (ImportError, NotImplementedError, OSError):
+                self._pool = None  # no process support (some Android builds)
+                self._pending.clear()
+        # Without a pool everything is indexed here, as one sequential build
+        local = ranges[:1] if self._pool is not None else ranges
+        for start, stop in local:
+            self._merge(index_range(self.path, start, stop, self._search))
+        index.builder = self if self._pending else None
+        if not self._pending:
+            self._finished()
+
+    @property
+    def done(self):
+        return not self._pending
+
+    def _merge(self, result):
+        stop, lines, postings, blocks = result
+        self.index.extend(stop, lines)
+        if self._search:
+            self.index.search.add_part(postings, blocks, min(blocks * BLOCK_SIZE, self.size))
+
+    def _next(self):
+        future, stop = self._pending[0]
+        try:
+            result = future.result()
+        except Exception:
+            # A dead worker costs speed, not the index: redo its range here
+            result = index_range(self.path, self.index.length, stop, self._search)
+        self._pending.popleft()
+        self._merge(result)
+        if not self._pending:
+            self._finished()
+
+    def merge_ready(self):
+        """Merge every result that has arrived, in file order"""
+        while self._pending and self._pending[0][0].done():
+            self._next()
+
+    def wait_for(self, length):
+        """Merge results until the index covers `length` or is complete"""
+        while self._pending and self.index.length < length:
+            self._next()
+
+    def finish(self):
+        self.wait_for(float("inf"))
+
+    def _finished(self):
+        self.index.builder = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        if STATS.enabled:
+            STATS.record("load_index_parallel", time.perf_counter() - self.started)
+        if self.finished is not None:
+            self.finished(self.index)
+
+    def close(self):
+        """Stop indexing; the index keeps what was merged so far"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+        self.index.builder = None
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Frame pre-rendering for the AutoScroll text reader
+A background producer composes the next frames into a bounded ring buffer,
+so a tick only has to pop a ready frame and write it
+"""
+
+import threading
+from collections import deque
+
+# Frames composed ahead of the one on screen
+DEFAULT_DEPTH = 8
+
+
+class FramePipeline:
+    """Bounded buffer of upcoming frames filled by a producer thread
+
+    reset() starts production at a position with the compose and advance
+    functions of the current text; the producer then walks forward one
+    display row per frame. take() pops frames up to the requested position
+    and returns that one, or None on a miss.
+    Every reset() or invalidate() starts a new generation, and frames
+    composed for an older one are thrown away.
+    """
+
+    def __init__(self, depth=DEFAULT_DEPTH):
+        self.depth = depth
+        self.hits = 0
+        self.misses = 0
+        self._frames = deque()
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._next = None
+        self._compose = None
+        self._advance = None
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._produce, name="frame-producer", daemon=True)
+        self._thread.start()
+
+    def reset(self, position, compose, advance):
+        """Drop buffered frames and produce from `position`
+
+        compose(position) builds a frame; advance(position) is the position
+        one display row further.
+        """
+        with self._cond:
+            self._generation += 1
+            self._frames.clear()
+            self._next = position
+            self._compose = compose
+            self._advance = advance
+            self._cond.notify_all()
+
+    def invalidate(self):
+        """Drop buffered frames and wait for the one being composed"""
+        with self._cond:
+            self._generation += 1
+            self._frames.clear()
+            self._next = None
+            while self._busy:
+                self._cond.wait()
+
+    def take(self, position):
+        """The buffered frame for `position`, or None if it is not ready"""
+        with self._cond:
+            frames = self._frames
+            while frames and frames[0][0] < position:
+                frames.popleft()
+            if frames and frames[0][0] == position:
+                frame = frames.popleft()[1]
+                self._cond.notify_all()  # room for one more
+                self.hits += 1
+                return frame
+            self.misses += 1
+            return None
+
+    def _produce(self):
+        cond = self._cond
+        while True:
+            with cond:
+                while not self._closed and (self._next is None or len(self._frames) >= self.depth):
+                    cond.wait()
+                if self._closed:
+                    return
+                generation, position = self._generation, self._next
+                compose, advance = self._compose, self._advance
+                self._busy = True
+            try:
+                frame = compose(position)
+                following = advance(position)
+            except Exception:
+                following = frame = None  # the engine thread recomposes it on a miss
+            with cond:
+                self._busy = False
+                if generation == self._generation and frame is not None:
+                    self._frames.append((position, frame))
+                    # The last row of the text has no successor
+                    self._next = following if following != position else None
+                elif generation == self._generation:
+                    self._next = None
+                cond.notify_all()
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"🎞️ Pre-rendered frames: {rate:.0%} ready ({self.hits}/{total}), depth {self.depth}"
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._next = None
+            self._cond.notify_all()
+        self._thread.join()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Differential terminal renderer for the AutoScroll text reader
+Keeps the previous frame and rewrites only the lines that changed
+"""
+
+import os
+import re
+import sys
+import time
+
+from .instrumentation import STATS
+
+CSI = "\x1b["
+HOME_AND_CLEAR = CSI + "H" + CSI + "2J"
+CLEAR_TO_EOL = CSI + "K"
+CLEAR_TO_EOS = CSI + "J"
+SGR = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def terminal_size(fallback=(80, 24)):
+    """Columns and lines of the terminal, honouring COLUMNS/LINES like shutil does
+
+    Avoids importing shutil, which drags in bz2/lzma and costs over 10 ms of
+    cold start even on desktop.
+    """
+    try:
+        columns = int(os.environ.get("COLUMNS", 0))
+    except ValueError:
+        columns = 0
+    try:
+        lines = int(os.environ.get("LINES", 0))
+    except ValueError:
+        lines = 0
+    if columns <= 0 or lines <= 0:
+        try:
+            size = os.get_terminal_size(sys.__stdout__.fileno())
+        except (AttributeError, ValueError, OSError):
+            size = os.terminal_size(fallback)
+        columns = columns if columns > 0 else size.columns or fallback[0]
+        lines = lines if lines > 0 else size.lines or fallback[1]
+    return columns, lines
+
+
+def clip(line, width):
+    """Cut a line to `width` columns, not counting SGR style codes"""
+    if len(line) <= width or "\x1b" not in line:
+        return line[:width]
+    parts = []
+    visible = 0
+    position = 0
+    for match in SGR.finditer(line):
+        take = min(match.start() - position, width - visible)
+        parts.append(line[position:position + take])
+        visible += take
+        parts.append(match.group())  # keep every code so styles are still reset
+        position = match.end()
+    parts.append(line[position:position + width - visible])
+    return "".join(parts)
+
+
+def supports_ansi(stream):
+    """Check whether a stream understands ANSI cursor movement"""
+    isatty = getattr(stream, "isatty", None)
+    if not isatty or not isatty():
+        return False
+    term = os.environ.get("TERM", "")
+    if term in ("", "dumb"):
+        # Windows consoles do not set TERM but modern ones handle VT codes
+        return os.name == "nt" and ("WT_SESSION" in os.environ or "ANSICON" in os.environ)
+    return True
+
+
+class TerminalRenderer:
+    def __init__(self, stream=None, ansi=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.ansi = supports_ansi(self.stream) if ansi is None else ansi
+        self.screen = []
+        self.full_redraw = True
+        self.frames = 0
+        self.bytes_written = 0
+        self.started = None
+
+    def invalidate(self):
+        """Force the next frame to redraw the whole screen"""
+        self.screen = []
+        self.full_redraw = True
+
+    def reset_stats(self):
+        """Start a new measurement window"""
+        self.frames = 0
+        self.bytes_written = 0
+        self.started = None
+
+    def render(self, lines):
+        """Draw a frame given as a list of lines, writing it in one call"""
+        if self.started is None:
+            self.started = time.monotonic()
+        if STATS.enabled:
+            diff_started = time.perf_counter()
+
+        if self.ansi:
+            width = terminal_size()[0]
+            lines = [clip(line, width) for line in lines]
+            output = self._diff(lines)
+        else:
+            output = "\n".join(lines) + "\n"
+        self.screen = lines
+        self.full_redraw = False
+
+        if STATS.enabled:
+            write_started = time.perf_counter()
+            STATS.record("diff", write_started - diff_started)
+        if output:
+            self.stream.write(output)
+            self.stream.flush()
+        if STATS.enabled:
+            STATS.record("write", time.perf_counter() - write_started)
+        self.frames += 1
+        self.bytes_written += len(output.encode("utf-8", "replace"))
+        return output
+
+    def _diff(self, lines):
+        """Build the escape sequence that turns the old screen into the new one"""
+        if self.full_redraw:
+            return HOME_AND_CLEAR + "\n".join(lines)
+
+        parts = []
+        old = self.screen
+        for row, line in enumerate(lines):
+            if row < len(old) and old[row] == line:
+                continue
+            parts.append(f"{CSI}{row + 1};1H{line}{CLEAR_TO_EOL}")
+        if len(lines) < len(old):
+            parts.append(f"{CSI}{len(lines) + 1};1H{CLEAR_TO_EOS}")
+        if parts:
+            # Park the cursor after the last line so prompts land below the frame
+            parts.append(f"{CSI}{len(lines)};{len(lines[-1]) + 1 if lines else 1}H")
+        return "".join(parts)
+
+    def stats(self):
+        """Return frames/sec and bytes written per frame"""
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        return {
+            "frames": self.frames,
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+            "bytes_per_frame": self.bytes_written / self.frames if self.frames else 0.0,
+            "ansi": self.ansi,
+        }
+
+    def report(self):
+        """Human readable summary of the renderer stats"""
+        s = self.stats()
+        mode = "ANSI diff" if s["ansi"] else "full redraw"
+        return f"📊 Renderer ({mode}): {s['frames']} frames, {s['fps']:.1f} fps, {s['bytes_per_frame']:.0f} bytes/frame"
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Session recording and deterministic replay for the AutoScroll text reader
+A session's commands are logged with the engine's tick count, so replaying
+them under a virtual clock draws exactly the same frames again
+
+The log is JSON lines: a header with the terminal size and tick policy,
+then one entry per command ({"t", "k", "c", "a", ...}), per tick that ran
+a whole interval or more late ({"k", "late"}) and per terminal resize
+({"n", "size"}), and a closing {"end", ...} entry. Command entries also
+carry the number of frames drawn before them and a digest of those, so a
+replay can tell between which commands it first drew something different.
+
+Ordering comes from tick counts rather than timestamps: a command logged
+with k=40 first took effect after exactly 40 ticks and is replayed there,
+whatever the virtual clock says. Timestamps only set the clock, which
+anchors tick deadlines after a start or a speed change.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from .renderer import TerminalRenderer, terminal_size
+
+FORMAT_VERSION = 1
+# Commands that replace the text; their entries record what was opened
+LOADS = ("init", "t", "f", "l")
+
+
+class VirtualClock:
+    """Monotonic clock that only moves when told to
+
+    With a speedup, moving it also sleeps for the elapsed time divided by
+    the speedup, so a replay can be watched at 1x, 10x and so on; with none
+    it runs as fast as the frames can be drawn.
+    """
+
+    def __init__(self, speedup=0.0):
+        self.now = 0.0
+        self.speedup = speedup
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.advance_to(self.now + seconds)
+
+    def advance_to(self, moment):
+        if moment <= self.now:
+            return
+        if self.speedup:
+            time.sleep((moment - self.now) / self.speedup)
+        self.now = moment
+
+
+class FrameDigest:
+    """Renderer wrapper that counts and hashes every frame drawn"""
+
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.frames = 0
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def render(self, lines):
+        self._hash.update("\n".join(lines).encode("utf-8", "surrogatepass") + b"\0")
+        self.frames += 1
+        self.renderer.render(lines)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        return getattr(self.renderer, name)
+
+
+class NullTerminal:
+    """Stream for replays nobody watches"""
+
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return True
+
+
+class SessionRecorder:
+    """Appends an app's commands, late ticks and resizes to a log file
+
+    Entries are written on the engine thread. A command's tick count is
+    taken when the first callable it submits to the engine runs, so a tick
+    that slips in while the UI thread is still finishing the command does
+    not reorder them on replay.
+    """
+
+    def __init__(self, app, path):
+        self.app = app
+        # Frames show the line count, so it must not grow at unrecorded moments
+        app.background_index = False
+        self.file = open(path, "w", encoding="utf-8")
+        self.digest = app.renderer = FrameDigest(app.renderer)
+        self.scheduler = app.engine.scheduler
+        self._submit = app.engine.submit
+        app.engine.submit = self._submit_marked
+        self._mark = None  # tick count at the running command's first effect
+        self._commander = None
+        self.started = self.scheduler.clock()
+        self.size = terminal_size()
+        self._write({
+            "v": FORMAT_VERSION,
+            "size": list(self.size),
+            "policy": self.scheduler.policy,
+            "compact": app.compact_text,
+            "markdown": app.markdown,
+            "ansi": app.renderer.ansi,
+        })
+        print(f"⏺️ Recording session to {path}")
+
+    def _write(self, entry):
+        self.file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _elapsed(self):
+        return round(self.scheduler.clock() - self.started, 6)
+
+    @contextlib.contextmanager
+    def command(self, choice, argument=None):
+        """Log the command run inside the block once it is done (UI thread)"""
+        mark = self._mark = []
+        self._commander = threading.get_ident()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._mark = self._commander = None
+            self._submit(lambda: self._command(choice, argument, failed, mark), wait=True)
+
+    def _submit_marked(self, command, wait=False):
+        mark = self._mark
+        if mark is None or mark or threading.get_ident() != self._commander:
+            return self._submit(command, wait)
+
+        def marked():
+            if not mark:
+                mark.extend(self._checkpoint())
+            command()
+
+        return self._submit(marked, wait)
+
+    def _checkpoint(self):
+        return self.scheduler.ticks, self.digest.frames, self.digest.hexdigest()
+
+    def _command(self, choice, argument, failed, mark):
+        app = self.app
+        ticks, frames, digest = mark or self._checkpoint()
+        entry = {"t": self._elapsed(), "k": ticks, "c": choice}
+        if argument is not None:
+            entry["a"] = argument
+        if failed:
+            entry["e"] = 1
+        elif choice in LOADS and (choice == "init" or (argument and argument.strip())):
+            if app.document is not None:
+                entry["path"] = app.document.path
+            elif argument and choice in ("init", "f"):
+                entry["path"] = os.path.abspath(os.path.expanduser(argument.strip()))
+            entry["pos"] = app.scroll_position
+            entry["speed"] = app.scroll_speed
+        entry["n"] = frames
+        entry["d"] = digest
+        self._write(entry)
+        self.file.flush()
+
+    def tick(self):
+        """Note a tick whose lateness changed how far it advanced (engine thread)"""
+        scheduler = self.scheduler
+        late = scheduler.lateness[-1]
+        if late >= scheduler.interval:
+            self._write({"k": scheduler.ticks, "late": late})
+
+    def resized(self):
+        """Note a terminal size change seen by the next frame (engine thread)"""
+        size = terminal_size()
+        if size != self.size:
+            self.size = size
+            self._write({"n": self.digest.frames, "size": list(size)})
+
+    def close(self):
+        self.app.engine.submit = self._submit
+        if self.app.engine.alive:
+            self.app.engine.submit(self._finish, wait=True)
+        else:
+            self._finish()
+        self.file.close()
+
+    def _finish(self):
+        self._write({
+            "end": self._elapsed(),
+            "k": self.scheduler.ticks,
+            "n": self.digest.frames,
+            "d": self.digest.hexdigest(),
+        })
+
+
+class SessionReplay:
+    """Re-runs a recorded session on the asyncio engine under a virtual clock
+
+    The library is left out, so documents open from their recorded paths
+    at their recorded positions and speeds instead of whatever the library
+    holds today.
+    """
+
+    def __init__(self, path, speedup=0.0, show=False):
+        with open(path, encoding="utf-8") as f:
+            self.entries = [json.loads(line) for line in f if line.strip()]
+        header = self.entries[0] if self.entries else {}
+        if header.get("v") != FORMAT_VERSION:
+            raise ValueError(f"{path} is not an AutoScroll session recording")
+        self.header = header
+        self.speedup = speedup
+        self.show = show
+        self.lates = {e["k"]: e["late"] for e in self.entries if "late" in e}
+        self.resizes = [e for e in self.entries if "size" in e and "n" in e]
+        self.clock = VirtualClock(speedup)
+        self.app = None
+        self.digest = None
+        self.divergence = None
+        self.recorded_frames = 0
+
+    def run(self):
+        """Replay every entry and return a summary of the frames drawn"""
+        from .app import SimpleAutoScrollApp
+        from .engine import AsyncScrollEngine
+
+        columns, lines = self.header["size"]
+        os.environ["COLUMNS"], os.environ["LINES"] = str(columns), str(lines)
+        app = self.app = SimpleAutoScrollApp(self.header["policy"], engine_class=AsyncScrollEngine,
+                                             compact_text=self.header.get("compact", False),
+                                             markdown=self.header.get("markdown", False))
+        app.library = False
+        app.background_index = False  # as when recording
+        scheduler = app.engine.scheduler
+        scheduler.clock, scheduler.sleep = self.clock, self.clock.sleep
+        stream = sys.stdout if self.show else NullTerminal()
+        ansi = self.header.get("ansi", True)
+        self.digest = app.renderer = FrameDigest(TerminalRenderer(stream, ansi=ansi))
+
+        output = contextlib.nullcontext() if self.show else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output, tempfile.TemporaryDirectory() as scratch:
+            try:
+                for number, entry in enumerate(self.entries[1:], 1):
+                    if "c" in entry:
+                        self._advance(entry["k"])
+                        self._check(number, entry)
+                        self.clock.advance_to(entry["t"])
+                        self._run_command(entry, scratch)
+                    elif "end" in entry:
+                        self._advance(entry["k"])
+                        self.clock.advance_to(entry["end"])
+                        self._check(number, entry)
+            finally:
+                app.shutdown()
+        return {
+            "frames": self.digest.frames,
+            "digest": self.digest.hexdigest(),
+            "recorded_frames": self.recorded_frames,
+            "identical": self.divergence is None,
+            "diverged_at": self.divergence,
+            "session_seconds": round(self.clock.now, 3),
+            "replay_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _advance(self, ticks):
+        """Run ticks at their deadlines until `ticks` have been taken in total"""
+        engine = self.app.engine
+        scheduler = engine.scheduler
+        while engine.scrolling and scheduler.ticks < ticks:
+            self._apply_resizes()
+            late = self.lates.get(scheduler.ticks + 1, 0.0)
+            self.clock.advance_to(scheduler.next_deadline + late)
+            engine.step()
+
+    def _apply_resizes(self):
+        frames = self.digest.frames
+        while self.resizes and self.resizes[0]["n"] <= frames:
+            columns, lines = self.resizes.pop(0)["size"]
+            os.environ["COLUMNS"], os.environ["LINES"] = str(columns), str(lines)
+
+    def _run_command(self, entry, scratch):
+        app = self.app
+        self._apply_resizes()
+        choice, argument = entry["c"], entry.get("a")
+        try:
+            if choice not in LOADS:
+                app.handle_command(choice, argument)
+            elif "pos" in entry and not entry.get("e"):
+                self._load(entry, scratch)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+
+    def _load(self, entry, scratch):
+        app = self.app
+        path = entry.get("path")
+        if entry["c"] == "t" and path:
+            # Pasted text lived in the library as a file; map it the same way
+            path = os.path.join(scratch, os.path.basename(path))
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(entry["a"])
+        if path:
+            app.load_file(path)
+        elif entry["c"] == "t":
+            app.load_text(entry["a"])
+        else:
+            from .app import SAMPLE_TEXT
+
+            app.load_text(SAMPLE_TEXT)
+        if not app.engine.scrolling:
+            app.engine.submit(lambda: app._jump(entry["pos"]))
+        app.set_speed(entry["speed"])
+
+    def _check(self, number, entry):
+        self.recorded_frames = entry["n"]
+        if self.divergence is not None:
+            return
+        if entry["n"] != self.digest.frames or entry["d"] != self.digest.hexdigest():
+            self.divergence = {
+                "entry": number,
+                "command": entry.get("c", "end"),
+                "at": entry.get("t", entry.get("end")),
+                "frames": self.digest.frames,
+                "recorded_frames": entry["n"],
+            }
+
+
+def replay(path, speedup=0.0, show=False):
+    """Entry point for `main.py --replay FILE`; True if the frames match"""
+    result = SessionReplay(path, speedup, show).run()
+    speed = f"{result['session_seconds'] / result['replay_seconds']:.0f}x" if result["replay_seconds"] else "instantly"
+    print(f"⏯️ Replayed {result['session_seconds']:.1f} s of session in {result['replay_seconds']:.2f} s ({speed})")
+    if result["identical"]:
+        print(f"✅ {result['frames']} frames, identical to the recording ({result['digest']})")
+        return True
+    diverged = result["diverged_at"]
+    print(f"❌ Frames differ from the recording before entry {diverged['entry']} "
+          f"('{diverged['command']}' at {diverged['at']:.2f} s): "
+          f"{diverged['frames']} frames drawn, {diverged['recorded_frames']} recorded")
+    return False
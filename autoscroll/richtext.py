@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Markdown rendering for the AutoScroll text reader
+Documents are parsed once into plain text plus styled runs; frames only look the runs up
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+
+BOLD = 1
+ITALIC = 2
+CODE = 4
+LINK = 8
+HEADING = 16
+QUOTE = 32
+STYLES = 64
+
+# Styled terminal rows kept; consecutive frames share all but one row
+ROW_CACHE_SIZE = 4096
+
+MARKDOWN_SUFFIXES = (".md", ".markdown", ".mdown", ".mkd")
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz")
+
+# SGR parameters per style bit for the terminal
+ANSI_CODES = ((HEADING, "1;4"), (BOLD, "1"), (ITALIC, "3"), (CODE, "36"), (LINK, "4;34"), (QUOTE, "2"))
+RESET = "\x1b[0m"
+# Kivy Label markup per style bit, outermost first
+KIVY_TAGS = (
+    (HEADING, "[size=19sp][b]", "[/b][/size]"),
+    (QUOTE, "[color=8a8a8a]", "[/color]"),
+    (LINK, "[u][color=3a7bd5]", "[/color][/u]"),
+    (CODE, "[font=RobotoMono-Regular]", "[/font]"),
+    (BOLD, "[b]", "[/b]"),
+    (ITALIC, "[i]", "[/i]"),
+)
+
+FENCE = re.compile(r" {0,3}(```|~~~)")
+HEADING_LINE = re.compile(r" {0,3}#{1,6}[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$")
+RULE = re.compile(r" {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+QUOTE_LINE = re.compile(r" {0,3}> ?(.*)$")
+BULLET = re.compile(r"([ \t]*)[-*+][ \t]+(.*)$")
+# Lines without any of these have no inline markup to parse
+SPECIAL = re.compile(r"[*_`\[\\]")
+INLINE = re.compile(
+    r"\\(?P<escaped>[\\`*_{}\[\]()#+\-.!>])"
+    r"|`(?P<code>[^`]+)`"
+    r"|!?\[(?P<link>[^\]]*)\]\([^)]*\)"
+    r"|\*\*(?P<strong>(?!\s).+?(?<!\s))\*\*"
+    r"|(?<!\w)__(?P<strong_u>(?!\s).+?(?<!\s))__(?!\w)"
+    r"|\*(?P<em>(?!\s).+?(?<!\s))\*"
+    r"|(?<!\w)_(?P<em_u>(?!\s).+?(?<!\s))_(?!\w)"
+)
+INLINE_STYLES = {"link": LINK, "strong": BOLD, "strong_u": BOLD, "em": ITALIC, "em_u": ITALIC}
+KIVY_ESCAPES = str.maketrans({"&": "&amp;", "[": "&bl;", "]": "&br;"})
+
+
+def _sgr(style):
+    codes = [code for bit, code in ANSI_CODES if style & bit]
+    return f"\x1b[{';'.join(codes)}m" if codes else ""
+
+
+def _kivy_tags(style):
+    tags = [(opening, closing) for bit, opening, closing in KIVY_TAGS if style & bit]
+    return "".join(t[0] for t in tags), "".join(t[1] for t in reversed(tags))
+
+
+SGR = [_sgr(style) for style in range(STYLES)]
+MARKUP = [_kivy_tags(style) for style in range(STYLES)]
+
+
+class RichText:
+    """Rendered Markdown that slices like a string of its plain text
+
+    Positions are characters of the plain text, so the index, search and
+    library work unchanged. Styles are kept as sorted, non-overlapping runs
+    in three arrays; styling a row costs one bisect plus a few joins, and
+    rows still on screen from the previous frame come from a small cache.
+    """
+
+    def __init__(self, plain, starts, ends, styles):
+        self.plain = plain
+        self.starts = starts
+        self.ends = ends
+        self.styles = styles
+        self._rows = {}
+
+    def __len__(self):
+        return len(self.plain)
+
+    def __bool__(self):
+        return bool(self.plain)
+
+    def __getitem__(self, key):
+        return self.plain[key]
+
+    def iter_chunks(self, size):
+        """Yield the plain text as consecutive str chunks"""
+        for start in range(0, len(self.plain), size):
+            yield self.plain[start:start + size]
+
+    def runs(self, start, stop):
+        """(start, stop, style) of the styled runs overlapping a range, clipped to it"""
+        starts, ends, styles = self.starts, self.ends, self.styles
+        i = bisect_right(ends, start)
+        while i < len(starts) and starts[i] < stop:
+            yield max(starts[i], start), min(ends[i], stop), styles[i]
+            i += 1
+
+    def ansi(self, start, stop):
+        """One display row with SGR escapes, trailing newlines removed"""
+        row = self._rows.get((start, stop))
+        if row is not None:
+            return row
+        plain = self.plain
+        end = stop
+        while end > start and plain[end - 1] == "\n":
+            end -= 1
+        parts = []
+        position = start
+        for run_start, run_stop, style in self.runs(start, end):
+            parts += (plain[position:run_start], SGR[style], plain[run_start:run_stop], RESET)
+            position = run_stop
+        row = "".join(parts) + plain[position:end] if parts else plain[start:end]
+        if len(self._rows) >= ROW_CACHE_SIZE:
+            self._rows.clear()
+        self._rows[start, stop] = row
+        return row
+
+    def markup(self, start, stop):
+        """A range as Kivy Label markup, with the plain text escaped"""
+        plain = self.plain
+        parts = []
+        position = start
+        for run_start, run_stop, style in self.runs(start, stop):
+            opening, closing = MARKUP[style]
+            parts.append(plain[position:run_start].translate(KIVY_ESCAPES))
+            parts.append(opening)
+            parts.append(plain[run_start:run_stop].translate(KIVY_ESCAPES))
+            parts.append(closing)
+            position = run_stop
+        parts.append(plain[position:stop].translate(KIVY_ESCAPES))
+        return "".join(parts)
+
+    def close(self):
+        """Nothing to release; present for the text source interface"""
+
+
+class _Builder:
+    """Collects plain text and merges adjacent runs of the same style"""
+
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.styles = array("B")
+
+    def emit(self, text, style=0):
+        if not text:
+            return
+        start = self.length
+        self.parts.append(text)
+        self.length += len(text)
+        if not style:
+            return
+        if self.styles and self.styles[-1] == style and self.ends[-1] == start:
+            self.ends[-1] = self.length
+        else:
+            self.starts.append(start)
+            self.ends.append(self.length)
+            self.styles.append(style)
+
+    def inline(self, text, style=0):
+        if not SPECIAL.search(text):
+            self.emit(text, style)
+            return
+        position = 0
+        for match in INLINE.finditer(text):
+            self.emit(text[position:match.start()], style)
+            kind = match.lastgroup
+            if kind == "escaped":
+                self.emit(match.group(kind), style)
+            elif kind == "code":
+                self.emit(match.group(kind), style | CODE)
+            else:
+                self.inline(match.group(kind), style | INLINE_STYLES[kind])
+            position = match.end()
+        self.emit(text[position:], style)
+
+    def build(self):
+        return RichText("".join(self.parts), self.starts, self.ends, self.styles)
+
+
+def parse_markdown(text):
+    """Render Markdown to a RichText in one pass over its lines"""
+    builder = _Builder()
+    fenced = False
+    lines = text.split("\n")
+    last = len(lines) - 1
+    for number, line in enumerate(lines):
+        end = "\n" if number < last else ""
+        if FENCE.match(line):
+            fenced = not fenced
+            continue
+        if fenced:
+            builder.emit(line + end, CODE)
+            continue
+        heading = HEADING_LINE.match(line)
+        rule = heading is None and RULE.match(line)
+        quote = bullet = None
+        if heading is None and not rule:
+            quote = QUOTE_LINE.match(line)
+            bullet = BULLET.match(line) if quote is None else None
+        if heading is not None:
+            builder.inline(heading.group(1), HEADING)
+        elif quote is not None:
+            builder.emit("│ ", QUOTE)
+            builder.inline(quote.group(1), QUOTE)
+        elif bullet is not None:
+            builder.emit(bullet.group(1) + "• ")
+            builder.inline(bullet.group(2))
+        elif rule:
+            builder.emit("─" * 40)
+        else:
+            builder.inline(line)
+        builder.emit(end)
+    return builder.build()
+
+
+def is_markdown(path):
+    """True for Markdown file names, compressed or not"""
+    name = path.lower()
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return name.endswith(MARKDOWN_SUFFIXES)
+
+
+def render_source(source):
+    """Decode a whole text source, close it and render it as Markdown"""
+    if getattr(source, "streaming", False):
+        while source.read_more():
+            pass
+    try:
+        return parse_markdown(source[0:len(source)])
+    finally:
+        source.close()
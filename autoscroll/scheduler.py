@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Drift-free tick scheduler for the AutoScroll text reader
+Ticks fire at absolute monotonic deadlines instead of sleeping after each frame
+"""
+
+import time
+from collections import deque
+
+CATCH_UP = "catchup"
+SKIP = "skip"
+POLICIES = (CATCH_UP, SKIP)
+
+
+class TickScheduler:
+    """Absolute-deadline ticker with a policy for missed frames
+
+    catchup: every missed tick is reported as due, so the caller can advance
+             by several steps and keep the real speed equal to the set speed
+             (bounded by max_catchup, after which the schedule re-anchors).
+    skip:    missed ticks are dropped and the next deadline moves past now,
+             so the caller never jumps but runs slower under load.
+    """
+
+    def __init__(self, interval, policy=CATCH_UP, clock=time.monotonic,
+                 sleep=time.sleep, max_catchup=10, samples=1024):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown tick policy: {policy}")
+        self.interval = interval
+        self.policy = policy
+        self.clock = clock
+        self.sleep = sleep
+        self.max_catchup = max_catchup
+        self.lateness = deque(maxlen=samples)
+        self.next_deadline = None
+        self.ticks = 0
+        self.missed = 0
+
+    def start(self):
+        """Anchor the schedule so the first tick is one interval from now"""
+        self.next_deadline = self.clock() + self.interval
+
+    def set_interval(self, interval):
+        """Change the tick period, keeping the phase of the last tick"""
+        if interval == self.interval:
+            return
+        if self.next_deadline is not None:
+            self.next_deadline += interval - self.interval
+        self.interval = interval
+
+    def remaining(self):
+        """Seconds until the next deadline (0 when already due)"""
+        if self.next_deadline is None:
+            self.start()
+        return max(0.0, self.next_deadline - self.clock())
+
+    def take(self):
+        """Consume the due tick(s) and return how many steps to advance"""
+        if self.next_deadline is None:
+            self.start()
+        now = self.clock()
+        late = now - self.next_deadline
+        self.lateness.append(late)
+        self.ticks += 1
+        missed = int(late // self.interval) if late > 0 else 0
+
+        if self.policy == CATCH_UP and missed < self.max_catchup:
+            due = missed + 1
+        else:
+            due = 1
+            self.missed += missed
+        self.next_deadline += (missed + 1) * self.interval
+        return due
+
+    def wait(self):
+        """Sleep until the next deadline, then take it"""
+        delay = self.remaining()
+        if delay > 0:
+            self.sleep(delay)
+        return self.take()
+
+    def stats(self):
+        """Lateness percentiles in milliseconds plus tick counters"""
+        samples = sorted(self.lateness)
+
+        def percentile(p):
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000
+
+        return {
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "p50_ms": percentile(50),
+            "p99_ms": percentile(99),
+            "max_ms": samples[-1] * 1000 if samples else 0.0,
+        }
+
+    def report(self):
+        """Human readable summary of the tick jitter"""
+        s = self.stats()
+        return (f"⏱️ Ticks: {s['ticks']} ({self.policy}), lateness p50 {s['p50_ms']:.2f} ms, "
+                f"p99 {s['p99_ms']:.2f} ms, max {s['max_ms']:.2f} ms, dropped {s['missed']}")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Full-text search for the AutoScroll text reader
+A quadgram index over fixed-size blocks narrows each query to a few blocks
+"""
+
+from array import array
+
+# Text units (characters or bytes, as for TextIndex) per indexed block
+BLOCK_SIZE = 1 << 16
+# Units of the previous block indexed again with each block, so a match
+# crossing a block boundary is still found through its first OVERLAP units
+OVERLAP = 64
+# Queries shorter than this (in UTF-8 bytes) cannot be narrowed and are scanned
+MIN_INDEXED = 7
+
+EMPTY = array("I")
+
+
+def _grams(data):
+    """4-byte sequences starting at 4-aligned offsets, as integers"""
+    return array("I", data[:len(data) & ~3])
+
+
+class SearchIndex:
+    """Case-insensitive substring search over a text
+
+    For every block the index records which ASCII-lowercased UTF-8 quadgrams
+    start at 4-aligned byte offsets in it. Any match of 7 bytes or more
+    covers a complete aligned quadgram for each of the four alignments, so
+    a block can only hold a match if, for some alignment, it contains all of
+    the query's quadgrams. Candidate blocks are then confirmed by a plain
+    find() on their text. Text is fed in chunks like TextIndex.feed().
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.blocks = 0
+        self.length = 0
+        self._units = str
+        self._pending = []
+        self._pending_len = 0
+        self._carry = b""
+        # Postings of parts indexed elsewhere (see add_part), in block order
+        self.parts = []
+
+    def feed(self, data):
+        """Append the next chunk of text to the index"""
+        if not data:
+            return
+        self._units = str if isinstance(data, str) else bytes
+        pos = 0
+        while pos < len(data):
+            take = min(BLOCK_SIZE - self._pending_len, len(data) - pos)
+            self._pending.append(data[pos:pos + take])
+            self._pending_len += take
+            pos += take
+            if self._pending_len == BLOCK_SIZE:
+                self._index_block()
+        self.length += len(data)
+
+    def _index_block(self):
+        block = self._pending[0][:0].join(self._pending)
+        self._pending = []
+        self._pending_len = 0
+        tail = block[-OVERLAP:]
+        if self._units is str:
+            block = block.encode("utf-8", "surrogatepass")
+            tail = tail.encode("utf-8", "surrogatepass")
+        data = (self._carry + block).lower()
+        self._carry = tail
+        number = self.blocks
+        postings = self.postings
+        for gram in set(_grams(data)):
+            blocks = postings.get(gram)
+            if blocks is None:
+                blocks = postings[gram] = array("I")
+            blocks.append(number)
+        self.blocks += 1
+
+    def add_part(self, postings, blocks, length):
+        """Add postings computed elsewhere for whole blocks of a byte text
+
+        The blocks must follow on from those already indexed; `blocks` and
+        `length` are the totals once they are added. Parts are not fed.
+        """
+        self.parts.append(postings)
+        self.blocks = blocks
+        self.length = length
+        self._units = bytes
+
+    def _posting(self, gram):
+        if not self.parts:
+            return self.postings.get(gram, EMPTY)
+        posting = array("I", self.postings.get(gram, EMPTY))
+        for part in self.parts:
+            posting.extend(part.get(gram, EMPTY))
+        return posting
+
+    def _encode(self, query):
+        return query.encode("utf-8", "surrogatepass").lower()
+
+    def _candidates(self, query):
+        """Sorted blocks that may hold a match, or None if every block may"""
+        if self._units is str:
+            prefix = self._encode(query[:OVERLAP])
+        else:
+            prefix = self._encode(query)[:OVERLAP]
+        if len(prefix) < MIN_INDEXED:
+            return None
+        found = set()
+        for align in range(4):
+            # Start from the rarest quadgram so the intersection stays small
+            postings = sorted((self._posting(gram) for gram in set(_grams(prefix[align:]))), key=len)
+            blocks = set(postings[0])
+            for posting in postings[1:]:
+                if not blocks:
+                    break
+                blocks.intersection_update(posting)
+            found.update(blocks)
+        return sorted(found)
+
+    def find(self, text, query, start=0, backward=False):
+        """Position of the first match at or after `start`, or of the last
+        match before it when `backward`; None if there is none"""
+        needle = self._encode(query)
+        if not needle or not self.length:
+            return None
+        size = len(query) if self._units is str else len(needle)
+        candidates = self._candidates(query)
+        if candidates is None:
+            candidates = range(self.blocks)
+        # The partly filled last block is not indexed yet, so always check it
+        blocks = list(candidates)
+        if self._pending_len:
+            blocks.append(self.blocks)
+
+        if backward:
+            last = (start - 1) // BLOCK_SIZE + 1
+            for block in reversed(blocks):
+                if block > last:
+                    continue
+                lo = max(0, block * BLOCK_SIZE - OVERLAP)
+                hi = min((block + 1) * BLOCK_SIZE, start - 1) + size
+                if lo < hi:
+                    hit = self._search(text, needle, lo, hi, backward)
+                    if hit is not None:
+                        return hit
+            return None
+
+        first = max(0, start // BLOCK_SIZE)
+        for block in blocks:
+            if block < first:
+                continue
+            lo = max(start, block * BLOCK_SIZE - OVERLAP)
+            hi = (block + 1) * BLOCK_SIZE + size
+            if lo < hi:
+                hit = self._search(text, needle, lo, hi, backward)
+                if hit is not None:
+                    return hit
+        return None
+
+    def _search(self, text, needle, lo, hi, backward):
+        """Find the needle in text[lo:hi]; returns a text position"""
+        hi = min(hi, self.length)
+        raw = getattr(text, "raw", None)
+        if raw is not None:
+            data = raw(lo, hi).lower()
+        else:
+            data = text[lo:hi].encode("utf-8", "surrogatepass").lower()
+        at = data.rfind(needle) if backward else data.find(needle)
+        if at < 0:
+            return None
+        if raw is not None:
+            return lo + at
+        return lo + len(data[:at].decode("utf-8", "surrogatepass"))
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Multi-session scroll server for the AutoScroll text reader
+One asyncio loop serves many readers over TCP (JSON lines) or WebSocket;
+documents and their indexes are loaded once and shared by every session
+
+Protocol: each message is one JSON object, a line on plain TCP or a text
+frame on WebSocket. Clients send
+    {"cmd": "open", "doc": 0, "width": 80, "rows": 20}
+    {"cmd": "start"} / {"cmd": "pause"} / {"cmd": "reset"}
+    {"cmd": "speed", "value": 2.5}
+    {"cmd": "seek", "line": 120} or {"cmd": "seek", "percent": 50}
+and receive "hello", "opened", "frame", "end" and "error" messages.
+
+WebSocket and plain clients share the port and are told apart by their
+first line. A plain client may send first or wait for "hello", which then
+comes after FIRST_LINE_WAIT seconds of silence.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from .index import TextIndex
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# The shared ticker advances every playing session this many times per second
+TICK_HZ = 30
+# Frames are dropped for readers with this much output still unsent
+MAX_BUFFERED = 64 * 1024
+# Largest client message accepted, in bytes
+MAX_MESSAGE = 64 * 1024
+# Silence after connecting that marks a plain client waiting for "hello";
+# WebSocket clients send their handshake request at once
+FIRST_LINE_WAIT = 0.25
+MAX_WIDTH = 500
+MAX_ROWS = 200
+MIN_SPEED, MAX_SPEED = 0.1, 5.0
+# Rendered frames kept per document, shared by sessions showing the same rows
+FRAME_CACHE_SIZE = 1024
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B85"
+
+
+class SharedDocument:
+    """A loaded text with one index per wrap width and a cache of frames"""
+
+    def __init__(self, doc_id, title, text):
+        self.id = doc_id
+        self.title = title
+        self.text = text
+        self._index = TextIndex.build(text, search=False)
+        self._indexes = {self._index.width: self._index}
+        self._frames = OrderedDict()
+
+    def index(self, width):
+        index = self._indexes.get(width)
+        if index is None:
+            index = self._indexes[width] = self._index.rewrapped(width)
+        return index
+
+    def frame(self, index, position, rows):
+        """Encoded frame message for `rows` rows from a position"""
+        key = (index.width, position, rows)
+        frame = self._frames.get(key)
+        if frame is not None:
+            self._frames.move_to_end(key)
+            return frame
+        text = self.text
+        frame = json.dumps({
+            "type": "frame",
+            "position": position,
+            "line": index.line_of(position) + 1,
+            "lines": index.line_count(),
+            "text": [text[start:end].rstrip("\n") for start, end in index.rows(position, rows)],
+        }, ensure_ascii=False)
+        self._frames[key] = frame
+        if len(self._frames) > FRAME_CACHE_SIZE:
+            self._frames.popitem(last=False)
+        return frame
+
+
+class LineConnection:
+    """JSON lines over a plain TCP stream"""
+
+    def __init__(self, reader, writer, first=b""):
+        self.reader = reader
+        self.writer = writer
+        self._first = first
+
+    async def receive(self):
+        """Next message text, or None once the peer is gone"""
+        if self._first:
+            line, self._first = self._first, b""
+        else:
+            try:
+                line = await self.reader.readline()
+            except (ConnectionError, ValueError):
+                return None
+        if not line:
+            return None
+        return line.decode("utf-8", "replace")
+
+    def send(self, text):
+        self.writer.write(text.encode("utf-8") + b"\n")
+
+    def backlogged(self):
+        return self.writer.transport.get_write_buffer_size() > MAX_BUFFERED
+
+
+class WebSocketConnection(LineConnection):
+    """Unfragmented text messages over RFC 6455 WebSocket frames"""
+
+    async def handshake(self):
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if not key or headers.get("upgrade", "").lower() != "websocket":
+            self.writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        return True
+
+    async def receive(self):
+        try:
+            while True:
+                head = await self.reader.readexactly(2)
+                opcode = head[0] & 0x0F
+                length = head[1] & 0x7F
+                if length == 126:
+                    length = int.from_bytes(await self.reader.readexactly(2), "big")
+                elif length == 127:
+                    length = int.from_bytes(await self.reader.readexactly(8), "big")
+                if length > MAX_MESSAGE:
+                    return None
+                mask = await self.reader.readexactly(4) if head[1] & 0x80 else b""
+                payload = await self.reader.readexactly(length)
+                if mask:
+                    key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+                    payload = (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+                if opcode == 0x8:  # close
+                    return None
+                if opcode == 0x9:  # ping
+                    self._write_frame(0xA, payload)
+                elif opcode == 0x1:
+                    return payload.decode("utf-8", "replace")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+
+    def send(self, text):
+        self._write_frame(0x1, text.encode("utf-8"))
+
+    def _write_frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            head = bytes((0x80 | opcode, length))
+        elif length < 1 << 16:
+            head = bytes((0x80 | opcode, 126)) + length.to_bytes(2, "big")
+        else:
+            head = bytes((0x80 | opcode, 127)) + length.to_bytes(8, "big")
+        self.writer.write(head + payload)
+
+
+class Session:
+    """One reader's independent position, speed and play state"""
+
+    __slots__ = ("connection", "document", "index", "rows", "position",
+                 "speed", "playing", "anchor", "advanced")
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.document = None
+        self.index = None
+        self.rows = 20
+        self.position = 0
+        self.speed = 1.0
+        self.playing = False
+        self.anchor = 0.0
+        self.advanced = 0
+
+
+class ScrollServer:
+    """Serves shared documents to many sessions from one event loop
+
+    Playing sessions are advanced by a single ticker rather than a timer
+    each. A session is due int((now - anchor) * speed) rows since it was
+    (re)started, so late ticks catch up instead of drifting.
+    """
+
+    def __init__(self, documents, host=DEFAULT_HOST, port=DEFAULT_PORT, clock=time.monotonic):
+        self.documents = documents
+        self.host = host
+        self.port = port
+        self.clock = clock
+        self.sessions = set()
+        self.playing = set()
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    async def run(self):
+        server = await asyncio.start_server(self._accept, self.host, self.port, limit=MAX_MESSAGE)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"🌐 Serving {len(self.documents)} document(s) on {self.host}:{self.port}")
+        ticker = asyncio.get_running_loop().create_task(self._ticker())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            ticker.cancel()
+
+    async def _ticker(self):
+        interval = 1.0 / TICK_HZ
+        deadline = self.clock()
+        while True:
+            deadline += interval
+            delay = deadline - self.clock()
+            if delay < 0:
+                deadline = self.clock()  # overloaded; do not try to replay ticks
+            await asyncio.sleep(max(0.0, delay))
+            self.tick(self.clock())
+
+    def tick(self, now):
+        """Advance every playing session to where it should be at `now`"""
+        for session in list(self.playing):
+            due = int((now - session.anchor) * session.speed) - session.advanced
+            if due <= 0:
+                continue
+            session.advanced += due
+            position = session.index.advance(session.position, due)
+            if position == session.position:
+                self._pause(session)
+                session.connection.send('{"type": "end"}')
+                continue
+            session.position = position
+            self._send_frame(session)
+
+    async def _accept(self, reader, writer):
+        try:
+            # An unfinished line stays buffered if the wait runs out
+            first = await asyncio.wait_for(reader.readline(), FIRST_LINE_WAIT)
+        except asyncio.TimeoutError:
+            first = b""
+        except (ConnectionError, ValueError):
+            writer.close()
+            return
+        if first.startswith(b"GET "):
+            connection = WebSocketConnection(reader, writer)
+            if not await connection.handshake():
+                writer.close()
+                return
+        else:
+            connection = LineConnection(reader, writer, first)
+
+        session = Session(connection)
+        self.sessions.add(session)
+        connection.send(json.dumps({
+            "type": "hello",
+            "documents": [{"id": d.id, "title": d.title, "length": len(d.text)} for d in self.documents],
+        }, ensure_ascii=False))
+        try:
+            while True:
+                message = await connection.receive()
+                if message is None:
+                    break
+                if not message.strip():
+                    continue
+                try:
+                    self.handle(session, json.loads(message))
+                except (ValueError, TypeError, KeyError, IndexError, OverflowError) as e:
+                    connection.send(json.dumps({"type": "error", "message": str(e)}))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(session)
+            self.playing.discard(session)
+            writer.close()
+
+    def handle(self, session, message):
+        """Apply one client command to its session"""
+        command = message["cmd"]
+        if command == "open":
+            doc_id = int(message.get("doc", 0))
+            if doc_id < 0:
+                raise IndexError(f"no document {doc_id}")
+            document = self.documents[doc_id]
+            session.document = document
+            session.index = document.index(max(1, min(MAX_WIDTH, int(message.get("width", 80)))))
+            session.rows = max(1, min(MAX_ROWS, int(message.get("rows", 20))))
+            session.position = 0
+            self._pause(session)
+            session.connection.send(json.dumps({
+                "type": "opened", "doc": document.id, "title": document.title,
+                "lines": session.index.line_count(),
+            }, ensure_ascii=False))
+            self._send_frame(session)
+            return
+        if session.document is None:
+            raise KeyError("open a document first")
+        if command == "start":
+            self._restart(session)
+            session.playing = True
+            self.playing.add(session)
+        elif command == "pause":
+            self._pause(session)
+        elif command == "speed":
+            session.speed = round(max(MIN_SPEED, min(MAX_SPEED, float(message["value"]))), 2)
+            self._restart(session)
+        elif command == "reset":
+            self._seek(session, 0)
+        elif command == "seek":
+            index = session.index
+            if "percent" in message:
+                self._seek(session, index.position_at_percent(float(message["percent"])))
+            else:
+                self._seek(session, index.line_start(int(message["line"]) - 1))
+        else:
+            raise KeyError(f"unknown command {command!r}")
+
+    def _restart(self, session):
+        session.anchor = self.clock()
+        session.advanced = 0
+
+    def _pause(self, session):
+        session.playing = False
+        self.playing.discard(session)
+
+    def _seek(self, session, position):
+        session.position = session.index.row_start(position)
+        self._restart(session)
+        self._send_frame(session)
+
+    def _send_frame(self, session):
+        if session.connection.backlogged():
+            self.frames_dropped += 1  # a slow reader skips frames rather than queueing them
+            return
+        session.connection.send(session.document.frame(session.index, session.position, session.rows))
+        self.frames_sent += 1
+
+
+def raise_file_limit():
+    """Allow as many open sockets as the hard limit permits"""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = 65536 if hard == resource.RLIM_INFINITY else hard
+    if soft != resource.RLIM_INFINITY and soft < target:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def load_documents(paths, sample_text, scratch):
+    """Open every path (or the sample text) as a shared document
+
+    Compressed files are decoded once into a copy in `scratch`, which must
+    outlive the server, and mapped like plain files. Served from their
+    small page cache, sessions far apart would keep decoding pages again
+    on the event loop.
+    """
+    if not paths:
+        return [SharedDocument(0, "Sample text", sample_text)]
+    from .source import MappedText, open_source
+
+    documents = []
+    for doc_id, path in enumerate(paths):
+        text = open_source(os.path.expanduser(path))
+        if getattr(text, "streaming", False):
+            copy = os.path.join(scratch, f"{doc_id}.txt")
+            with open(copy, "wb") as f:
+                for page in iter(text.read_more, b""):
+                    f.write(page)
+            text.close()
+            text = MappedText(copy)
+        documents.append(SharedDocument(doc_id, os.path.basename(path), text))
+    return documents
+
+
+def serve(paths, address, sample_text):
+    """Entry point for `main.py --serve [HOST:]PORT`"""
+    host, _, port = address.rpartition(":")
+    raise_file_limit()
+    with tempfile.TemporaryDirectory(prefix="autoscroll-", ignore_cleanup_errors=True) as scratch:
+        server = ScrollServer(load_documents(paths, sample_text, scratch), host or DEFAULT_HOST,
+                              int(port or DEFAULT_PORT))
+        try:
+            asyncio.run(server.run())
+        except KeyboardInterrupt:
+            print(f"\n👋 Server stopped after {server.frames_sent} frames ({server.frames_dropped} dropped)")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Sidecar index files for the AutoScroll text reader
+A large document's offset tables are saved next to it (doc.txt.asidx) and
+mapped back on the next open instead of scanning the document again
+
+Layout: a HEADER_SIZE-byte header, then the tables one after another, each
+padded to 8 bytes: line starts (u64), and if the search
+index was saved, its quadgrams (u32, sorted), the offset of each gram's
+block list (u64, one more than there are grams) and the block lists (u32).
+Tables are in the byte order of the machine that wrote them; a file from
+another byte order is treated as stale.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+
+from .search import BLOCK_SIZE
+
+MAGIC = b"ASIDX\0\0\0"
+FORMAT_VERSION = 2
+SUFFIX = ".asidx"
+# The whole document is too slow to hash on open; these many evenly spaced
+# samples of SAMPLE_BYTES each are hashed along with its size and mtime
+SAMPLES = 16
+SAMPLE_BYTES = 64 * 1024
+
+# magic, version, flags, size, mtime_ns, sample hash, then table lengths:
+# lines, search blocks, search length, grams, block list entries
+HEADER = struct.Struct("<8sIIQq16sQQQQQ")
+HEADER_SIZE = 128
+HAS_SEARCH = 1
+BIG_ENDIAN = 2
+NATIVE = BIG_ENDIAN if sys.byteorder == "big" else 0
+
+
+class MappedPostings:
+    """Read-only stand-in for SearchIndex.postings backed by sidecar tables"""
+
+    def __init__(self, grams, offsets, blocks):
+        self.grams = grams
+        self.offsets = offsets
+        self.blocks = blocks
+
+    def get(self, gram, default=None):
+        i = bisect_left(self.grams, gram)
+        if i < len(self.grams) and self.grams[i] == gram:
+            return self.blocks[self.offsets[i]:self.offsets[i + 1]]
+        return default
+
+
+def stamp(text):
+    """(size, mtime_ns, sample hash) identifying the contents of a MappedText"""
+    size = len(text)
+    digest = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=16)
+    step = max(0, size - SAMPLE_BYTES) // (SAMPLES - 1)
+    for number in range(SAMPLES):
+        start = number * step
+        digest.update(text.raw(start, start + SAMPLE_BYTES))
+    return size, os.stat(text.path).st_mtime_ns, digest.digest()
+
+
+def sidecar_paths(path):
+    """Where a document's sidecar may live: beside it, else in the library's home"""
+    from .library import library_home
+
+    path = os.path.abspath(path)
+    name = hashlib.blake2b(path.encode("utf-8", "surrogateescape"), digest_size=8).hexdigest()
+    return path + SUFFIX, os.path.join(library_home(), "indexes", name + SUFFIX)
+
+
+def load(text, text_stamp, width=80, search=True):
+    """TextIndex for a MappedText from a valid sidecar, or None if there is none"""
+    for path in sidecar_paths(text.path):
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            continue  # missing, unreadable or empty
+        index = _from_buffer(buffer, text_stamp, width, search)
+        if index is not None:
+            return index
+    return None
+
+
+def _from_buffer(buffer, text_stamp, width, search):
+    from .index import TextIndex
+    from .search import SearchIndex
+
+    if len(buffer) < HEADER_SIZE:
+        return None
+    magic, version, flags, size, mtime_ns, digest, lines, blocks, search_length, grams, entries = \
+        HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != FORMAT_VERSION or flags & BIG_ENDIAN != NATIVE:
+        return None
+    if (size, mtime_ns, digest) != text_stamp or (search and not flags & HAS_SEARCH):
+        return None
+    tables = [(lines, "Q")]
+    if search:
+        tables += [(grams, "I"), (grams + 1, "Q"), (entries, "I")]
+    end = HEADER_SIZE + sum(_padded(count * struct.calcsize(code)) for count, code in tables)
+    if len(buffer) < end:
+        return None  # cut short while being written by an older version
+
+    view = memoryview(buffer)
+    offset = HEADER_SIZE
+    mapped = []
+    for count, code in tables:
+        nbytes = count * struct.calcsize(code)
+        mapped.append(view[offset:offset + nbytes].cast(code))
+        offset += _padded(nbytes)
+
+    index = TextIndex(width, search=False)
+    index.line_starts = mapped[0]
+    index.length = size
+    index._blocks = [None] * index.block_count()
+    if search:
+        index.search = SearchIndex()
+        index.search.postings = MappedPostings(*mapped[1:])
+        index.search.blocks = blocks
+        index.search.length = search_length
+        index.search._units = bytes
+        # A partly filled last block was not indexed; find() checks it directly
+        index.search._pending_len = max(0, search_length - blocks * BLOCK_SIZE)
+    return index
+
+
+def _padded(nbytes):
+    return nbytes + -nbytes % 8
+
+
+def save(path, text_stamp, index):
+    """Write the sidecar of a completely indexed document, beside it if possible"""
+    search = index.search
+    flags = NATIVE
+    tables = [index.line_starts]
+    blocks = search_length = 0
+    if search is not None:
+        flags |= HAS_SEARCH
+        tables += _postings_tables(search)
+        blocks, search_length = search.blocks, search.length
+    size, mtime_ns, digest = text_stamp
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, size, mtime_ns, digest,
+                         len(tables[0]), blocks, search_length,
+                         len(tables[1]) if search is not None else 0,
+                         len(tables[3]) if search is not None else 0)
+    error = None
+    for target in sidecar_paths(path):
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _write(target, header, tables)
+            return target
+        except OSError as e:
+            error = e
+    raise error
+
+
+def save_later(path, text_stamp, index):
+    """Save a sidecar on a thread of its own; the index must be complete
+
+    Failing to write one only costs the next open its speed, so errors
+    are reported and otherwise ignored.
+    """
+    def run():
+        try:
+            save(path, text_stamp, index)
+        except OSError as e:
+            print(f"⚠️ Could not save the index of {path}: {e}")
+
+    thread = threading.Thread(target=run, name="sidecar-writer")
+    thread.start()
+    return thread
+
+
+def _postings_tables(search):
+    """Sorted grams, block list offsets and block lists of a SearchIndex"""
+    sources = [search.postings, *search.parts]
+    gram_table = array("I", sorted(set().union(*sources)))
+    offsets = array("Q", [0])
+    block_lists = array("I")
+    for gram in gram_table:
+        for source in sources:
+            numbers = source.get(gram)
+            if numbers is not None:
+                block_lists.extend(numbers)
+        offsets.append(len(block_lists))
+    return [gram_table, offsets, block_lists]
+
+
+def _write(target, header, tables):
+    # Written aside and renamed, so a reader never maps a half-written file
+    partial = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(partial, "wb") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            for table in tables:
+                data = memoryview(table).cast("B")
+                f.write(data)
+                f.write(b"\0" * (-len(data) % 8))
+        os.replace(partial, target)
+    except OSError:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
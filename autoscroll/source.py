@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+File-backed text sources for the AutoScroll text reader
+Documents are memory-mapped so only the visible window is ever decoded
+"""
+
+import mmap
+import os
+from array import array
+
+# Characters between the byte-offset checkpoints of a Utf8Text
+CHECKPOINT_CHARS = 4096
+
+
+class MappedText:
+    """Read-only view of a UTF-8 file that slices like a string
+
+    Positions are byte offsets into the file. Slices are decoded on demand,
+    so resident memory stays roughly constant whatever the file size.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        if self.size:
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # mmap refuses empty files
+            self.buffer = b""
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1]
+        start, stop, _ = key.indices(self.size)
+        start = self._char_start(start)
+        stop = self._char_start(stop)
+        return self.buffer[start:stop].decode("utf-8", "replace")
+
+    def raw(self, start, stop):
+        """Undecoded bytes of a range"""
+        return self.buffer[start:stop]
+
+    def _char_start(self, pos):
+        """Move a byte offset forward past UTF-8 continuation bytes"""
+        while pos < self.size and self.buffer[pos] & 0xC0 == 0x80:
+            pos += 1
+        return pos
+
+    def iter_chunks(self, size):
+        """Yield the raw bytes of the file in consecutive chunks"""
+        for start in range(0, self.size, size):
+            yield self.buffer[start:start + size]
+
+    def close(self):
+        """Release the mapping and the file handle"""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+
+class Utf8Text:
+    """In-memory text stored as UTF-8 bytes that slices like a string
+
+    Positions are characters, as for a str, so the index and the reader
+    need no changes. A str widens every character to the widest one it
+    holds (one emoji makes the whole text 4 bytes per character); here each
+    character costs 1-4 bytes. The byte offset of every CHECKPOINT_CHARS-th
+    character is recorded, so a slice decodes only the spans it touches.
+    """
+
+    def __init__(self, text):
+        self.buffer = text.encode("utf-8", "surrogatepass")
+        self.length = len(text)
+        self._ascii = len(self.buffer) == self.length
+        self.offsets = array("Q", [0])
+        if not self._ascii:
+            offset = 0
+            for start in range(0, self.length, CHECKPOINT_CHARS):
+                offset += len(text[start:start + CHECKPOINT_CHARS].encode("utf-8", "surrogatepass"))
+                self.offsets.append(offset)
+
+    def __len__(self):
+        return self.length
+
+    def __bool__(self):
+        return self.length > 0
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1]
+        start, stop, _ = key.indices(self.length)
+        if start >= stop:
+            return ""
+        if self._ascii:
+            return self.buffer[start:stop].decode("ascii")
+        first = start // CHECKPOINT_CHARS
+        last = (stop + CHECKPOINT_CHARS - 1) // CHECKPOINT_CHARS
+        span = self.buffer[self.offsets[first]:self.offsets[last]].decode("utf-8", "surrogatepass")
+        base = first * CHECKPOINT_CHARS
+        return span[start - base:stop - base]
+
+    def iter_chunks(self, size):
+        """Yield the text as consecutive str chunks"""
+        for start in range(0, self.length, size):
+            yield self[start:start + size]
+
+    @property
+    def nbytes(self):
+        return len(self.buffer) + self.offsets.itemsize * len(self.offsets)
+
+
+def open_source(path):
+    """Open a document file: compressed files stream, plain files are mapped
+
+    Markdown files are decoded whole and rendered once into a RichText.
+    """
+    from .compressed import CompressedText, compression_of
+    from .richtext import is_markdown, render_source
+
+    kind = compression_of(path)
+    source = CompressedText(path, kind) if kind is not None else MappedText(path)
+    if is_markdown(path):
+        return render_source(source)
+    return source
+
+
+def iter_chunks(text, size=1 << 20):
+    """Yield consecutive chunks of a str or file-backed text"""
+    if hasattr(text, "iter_chunks"):
+        yield from text.iter_chunks(size)
+        return
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup budget check for the AutoScroll text reader
+Measures time-to-first-frame of a fresh interpreter and fails when it is over budget
+
+Usage:
+    python -m autoscroll.startup                  # default budget
+    python -m autoscroll.startup --budget-ms 150 --runs 7 --imports 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Time from spawning the interpreter to the first drawn frame, in milliseconds
+STARTUP_BUDGET_MS = 250
+MARKER = "FIRST_FRAME"
+
+# Runs in the child; keep it to what a real start needs
+PROBE = (
+    "import io, sys\n"
+    "from autoscroll.cli import first_frame\n"
+    "first_frame(io.StringIO())\n"
+    f"sys.stdout.write('\\n{MARKER}\\n')\n"
+    "sys.stdout.flush()\n"
+)
+
+
+def measure_once(importtime=False):
+    """Spawn one interpreter; return (ms to first frame, -X importtime output)"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", PROBE]
+    started = time.perf_counter()
+    child = subprocess.Popen(command, cwd=root, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, text=True)
+    elapsed = None
+    for line in child.stdout:
+        if line.strip() == MARKER:
+            elapsed = (time.perf_counter() - started) * 1000
+            break
+    child.stdout.read()
+    stderr = child.stderr.read()
+    if child.wait() != 0 or elapsed is None:
+        raise RuntimeError(f"Startup probe failed:\n{stderr}")
+    return elapsed, stderr
+
+
+def slowest_imports(importtime_output, count):
+    """(cumulative µs, module) pairs from -X importtime, slowest first"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check AutoScroll time-to-first-frame")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("AUTOSCROLL_STARTUP_BUDGET_MS", STARTUP_BUDGET_MS)))
+    parser.add_argument("--runs", type=int, default=5, help="median of this many cold starts")
+    parser.add_argument("--imports", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    timings = [measure_once()[0] for _ in range(args.runs)]
+    median = statistics.median(timings)
+    _, importtime = measure_once(importtime=True)
+
+    print(f"⏱️ Time to first frame: median {median:.1f} ms, min {min(timings):.1f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports (cumulative):")
+    for micros, name in slowest_imports(importtime, args.imports):
+        print(f"  {micros / 1000:8.2f} ms  {name}")
+
+    if median > args.budget_ms:
+        print("❌ Startup is over budget")
+        sys.exit(1)
+    print("✅ Startup is within budget")
+
+
+if __name__ == "__main__":
+    main()
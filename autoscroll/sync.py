@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Leader/follower position sync for the AutoScroll text reader
+One instance leads and sends its scroll state over UDP; followers estimate
+the clock offset to the leader and tick in phase with it between packets
+
+The leader sends {"t": "state", ...} datagrams after every tick, seek and
+speed change, plus a heartbeat, to every follower that pinged it recently.
+A state carries the position shown, the leader-clock time of the tick that
+showed it, the tick interval and a stamp of the document, which followers
+showing anything else ignore. A follower maps that onto its own clock
+and re-phases its engine's scheduler, so both advance the next row at the
+same instant; between packets it simply keeps ticking (dead reckoning).
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+from .engine import EngineStopped
+
+DEFAULT_PORT = 8766
+# Seconds between state heartbeats, which also carry pauses and seeks
+HEARTBEAT = 0.1
+# Seconds between a follower's clock pings (which also keep it registered)
+PING_INTERVAL = 0.25
+# Followers not heard from for this long stop receiving states
+FOLLOWER_TIMEOUT = 5.0
+# Clock samples kept; the one with the shortest round trip wins
+OFFSET_SAMPLES = 16
+MAX_DATAGRAM = 2048
+# Characters at the start of a text that go into its document stamp
+STAMP_CHARS = 4096
+
+
+def parse_address(address, default_host):
+    host, _, port = address.rpartition(":")
+    return host or default_host, int(port or DEFAULT_PORT)
+
+
+def document_stamp(text):
+    """Short id of a text that is the same on every machine showing it
+
+    How far a text is decoded or indexed differs between readers, so the
+    stamp uses the size of the file behind it (or of the str) and its
+    first characters instead.
+    """
+    path = getattr(text, "path", None)
+    size = os.stat(path).st_size if path else len(text)
+    head = text[0:STAMP_CHARS].encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(size.to_bytes(8, "little") + head, digest_size=8).hexdigest()
+
+
+class StampCache:
+    """document_stamp() of the text last asked about, computed once per text"""
+
+    def __init__(self):
+        self._text = None
+        self._stamp = None
+
+    def __call__(self, text):
+        if text is not self._text:
+            self._text, self._stamp = text, document_stamp(text)
+        return self._stamp
+
+
+class SyncLeader:
+    """Sends the app's scroll state to every registered follower"""
+
+    def __init__(self, app, address, clock=time.monotonic):
+        self.app = app
+        self.clock = clock
+        self.stamp = StampCache()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(parse_address(address, "0.0.0.0"))
+        self.sock.settimeout(HEARTBEAT)
+        self.followers = {}  # address -> time of its last ping
+        self.seq = 0
+        self.sent = 0
+        self._last_publish = 0.0
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="sync-leader", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        host, port = self.sock.getsockname()
+        print(f"📡 Leading sync on {host}:{port}")
+
+    def publish(self):
+        """Send the current state (called on the engine thread)"""
+        app = self.app
+        scheduler = app.engine.scheduler
+        interval = scheduler.interval
+        deadline = scheduler.next_deadline
+        self.seq += 1
+        self._last_publish = self.clock()
+        packet = json.dumps({
+            "t": "state",
+            "seq": self.seq,
+            "pos": app.scroll_position,
+            "at": deadline - interval if deadline is not None else 0.0,
+            "iv": interval,
+            "run": app.engine.scrolling,
+            "doc": self.stamp(app.text),
+        }).encode()
+        now = self.clock()
+        for address, seen in list(self.followers.items()):
+            if now - seen > FOLLOWER_TIMEOUT:
+                self.followers.pop(address, None)
+                continue
+            try:
+                self.sock.sendto(packet, address)
+                self.sent += 1
+            except OSError:
+                self.followers.pop(address, None)
+
+    def _serve(self):
+        while self._running:
+            try:
+                data, address = self.sock.recvfrom(MAX_DATAGRAM)
+            except socket.timeout:
+                data = None
+            except OSError:
+                return  # socket closed
+            if data:
+                received = self.clock()
+                try:
+                    message = json.loads(data)
+                except ValueError:
+                    continue
+                if message.get("t") == "ping":
+                    self.followers[address] = received
+                    self._reply(address, message.get("t0"), received)
+            if self.clock() - self._last_publish >= HEARTBEAT:
+                self._last_publish = self.clock()
+                try:
+                    self.app.engine.submit(self.publish)
+                except EngineStopped:
+                    return  # engine shut down
+
+    def _reply(self, address, t0, received):
+        pong = json.dumps({"t": "pong", "t0": t0, "t1": received, "t2": self.clock()}).encode()
+        try:
+            self.sock.sendto(pong, address)
+        except OSError:
+            pass
+
+    def report(self):
+        return f"📡 Sync: {len(self.followers)} follower(s), {self.sent} states sent"
+
+    def close(self):
+        self._running = False
+        self.sock.close()
+
+
+class SyncFollower:
+    """Tracks a leader's clock and keeps the app's engine in phase with it"""
+
+    def __init__(self, app, address, clock=time.monotonic):
+        self.app = app
+        self.clock = clock
+        self.stamp = StampCache()
+        self.leader = parse_address(address, "127.0.0.1")
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("0.0.0.0", 0))
+        self.sock.settimeout(PING_INTERVAL)
+        self.samples = deque(maxlen=OFFSET_SAMPLES)
+        self.offset = None  # leader clock minus local clock
+        self.rtt = None
+        self.seq = 0
+        self.corrections = 0
+        self._warned = False
+        self._running = True
+        self._thread = threading.Thread(target=self._listen, name="sync-follower", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        print(f"🔗 Following sync leader at {self.leader[0]}:{self.leader[1]}")
+
+    def _listen(self):
+        next_ping = 0.0
+        while self._running:
+            now = self.clock()
+            if now >= next_ping:
+                self._ping(now)
+                # Ping quickly until the first offset estimate exists
+                next_ping = now + (PING_INTERVAL if self.offset is not None else PING_INTERVAL / 10)
+            try:
+                data, _ = self.sock.recvfrom(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                return  # socket closed
+            received = self.clock()
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            kind = message.get("t")
+            if kind == "pong":
+                self._sample(message, received)
+            elif kind == "state" and self.offset is not None and message["seq"] > self.seq:
+                self.seq = message["seq"]
+                offset = self.offset
+                try:
+                    self.app.engine.submit(lambda: self._apply(message, offset))
+                except EngineStopped:
+                    return  # engine shut down
+
+    def publish(self):
+        """Followers only listen"""
+
+    def _ping(self, now):
+        try:
+            self.sock.sendto(json.dumps({"t": "ping", "t0": now}).encode(), self.leader)
+        except OSError:
+            pass
+
+    def _sample(self, pong, received):
+        """NTP-style offset from one ping round trip"""
+        t0, t1, t2 = pong["t0"], pong["t1"], pong["t2"]
+        rtt = (received - t0) - (t2 - t1)
+        self.samples.append((rtt, ((t1 - t0) + (t2 - received)) / 2))
+        self.rtt, self.offset = min(self.samples)
+
+    def _apply(self, state, offset):
+        """Move the app to the leader's position and phase (engine thread)"""
+        app = self.app
+        if state["doc"] != self.stamp(app.text):
+            if not self._warned:
+                self._warned = True
+                print("⚠️ Sync leader shows a different document; load the same text to follow it")
+            return
+        self._warned = False
+        engine = app.engine
+        interval = state["iv"]
+        position = state["pos"]
+        started = state["run"] and not engine.scrolling
+        speed = round(1.0 / interval, 2)
+        if speed != app.scroll_speed:
+            # As for a local speed change, so pre-rendered headers are redrawn
+            app._apply_speed(speed)
+        if state["run"]:
+            # Rows the leader has advanced since the tick this state describes
+            rows = max(0, int((self.clock() + offset - state["at"]) // interval))
+            if rows:
+                position = app.index.advance(position, rows)
+            if started:
+                app.renderer.invalidate()
+                engine.start()
+            engine.set_interval(interval)
+            engine.scheduler.next_deadline = state["at"] + (rows + 1) * interval - offset
+        elif engine.scrolling:
+            engine.stop()
+        if position != app.scroll_position:
+            self.corrections += 1
+            app.scroll_position = app.index.row_start(app._ensure_decoded(position))
+            app.render_frame()
+        elif started:
+            app.render_frame()
+
+    def report(self):
+        if self.offset is None:
+            return "🔗 Sync: no reply from the leader yet"
+        return (f"🔗 Sync: clock offset {self.offset * 1000:+.3f} ms (±{self.rtt * 500:.3f} ms), "
+                f"{self.corrections} position corrections")
+
+    def close(self):
+        self._running = False
+        self.sock.close()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Headless benchmarks for the AutoScroll terminal engines
+Drives SimpleAutoScrollApp with a fake clock and a captured terminal and prints JSON
+
+Usage:
+    python benchmark.py                          # 1K..1G
+    python benchmark.py --sizes 1K,1M --ticks 200 --output bench.json
+    python benchmark.py --compare old.json new.json
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from autoscroll.engine import AsyncScrollEngine
+from autoscroll.renderer import TerminalRenderer
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# main.py and simple_android_main.py both run the autoscroll package engine
+ENGINES = {
+    "autoscroll": "autoscroll.app",
+}
+DEFAULT_SIZES = "1K,1M,100M,1G"
+# Documents above this size are memory-mapped instead of loaded as a str
+MAP_THRESHOLD = 16 * 1024 * 1024
+FORMAT_VERSION = 1
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+         "tempor incididunt ut labore et dolore magna aliqua").split()
+
+
+class FakeClock:
+    """Monotonic clock whose sleep() advances time instantly"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class CapturedTerminal:
+    """Write-only stream that counts what the renderer sends"""
+
+    def __init__(self):
+        self.bytes = 0
+        self.writes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+        self.writes += 1
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return True
+
+
+def parse_size(text):
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper()
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def document_path(size):
+    """Create (once) a deterministic text file of the requested size"""
+    path = os.path.join(tempfile.gettempdir(), f"autoscroll-bench-{size}.txt")
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        return path
+    rng = random.Random(size)
+    block = []
+    block_len = 0
+    while block_len < 1024 * 1024:
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 24))) + "\n"
+        block.append(line)
+        block_len += len(line)
+    block = "".join(block).encode("ascii")
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+    return path
+
+
+def load_engine(name):
+    return importlib.import_module(ENGINES[name])
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+
+def remove_sidecars(path):
+    """Delete the sidecar index a mapped document may have left beside it"""
+    from autoscroll.sidecar import sidecar_paths
+
+    for sidecar in sidecar_paths(path):
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+
+
+def wait_for_sidecars():
+    for thread in threading.enumerate():
+        if thread.name == "sidecar-writer":
+            thread.join()
+
+
+def run_case(engine, size, ticks):
+    """Benchmark one engine on one document size in the current process
+
+    The library lives in a scratch directory, and any sidecar index is
+    removed before and after, so every run starts cold. Mapped documents
+    are then reopened from their fresh sidecar for a warm load time.
+    """
+    os.environ["COLUMNS"], os.environ["LINES"] = "80", "24"
+    module = load_engine(engine)
+    path = document_path(size)
+    clock = FakeClock()
+    terminal = CapturedTerminal()
+    mapped = size > MAP_THRESHOLD
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["AUTOSCROLL_HOME"] = home
+        if mapped:
+            remove_sidecars(path)
+        try:
+            result = measure_case(module, path, size, ticks, clock, terminal, mapped)
+        finally:
+            if mapped:
+                wait_for_sidecars()
+                remove_sidecars(path)
+    result["engine"] = engine
+    return result
+
+
+def measure_case(module, path, size, ticks, clock, terminal, mapped):
+    with contextlib.redirect_stdout(io.StringIO()):
+        app = module.SimpleAutoScrollApp(engine_class=AsyncScrollEngine)
+        # Time the whole index, not just the part built before scrolling starts
+        app.background_index = False
+        app.renderer = TerminalRenderer(terminal, ansi=True)
+        app.engine.scheduler.clock = clock
+        app.engine.scheduler.sleep = clock.sleep
+
+        started = time.perf_counter()
+        if mapped:
+            app.load_file(path)
+        else:
+            with open(path, encoding="utf-8") as f:
+                app.load_text(f.read())
+        load_ms = (time.perf_counter() - started) * 1000
+
+        app.set_speed(5.0)
+        app.start_scroll()
+        frame_times = []
+        blocks_before = sys.getallocatedblocks()
+        run_started = time.perf_counter()
+        for _ in range(ticks):
+            tick_started = time.perf_counter()
+            if not app.engine.step():
+                app.reset_scroll()
+                app.start_scroll()
+            frame_times.append(time.perf_counter() - tick_started)
+        run_seconds = time.perf_counter() - run_started
+        blocks_after = sys.getallocatedblocks()
+
+        warm_ms = None
+        if mapped:
+            # Reopen outside the library, whose cache would skip the load entirely
+            wait_for_sidecars()
+            app.library = False
+            started = time.perf_counter()
+            app.load_file(path)
+            warm_ms = round((time.perf_counter() - started) * 1000, 3)
+        app.shutdown()
+
+    return {
+        "size_bytes": size,
+        "mode": "mmap" if mapped else "str",
+        "ticks": ticks,
+        "load_text_ms": round(load_ms, 3),
+        "load_text_warm_ms": warm_ms,
+        "ticks_per_sec": round(ticks / run_seconds, 1) if run_seconds else None,
+        "frame_ms_p50": round(percentile(frame_times, 50) * 1000, 4),
+        "frame_ms_p99": round(percentile(frame_times, 99) * 1000, 4),
+        "bytes_per_frame": round(terminal.bytes / max(1, terminal.writes), 1),
+        "alloc_blocks_per_tick": round((blocks_after - blocks_before) / ticks, 3),
+        "peak_rss_kb": peak_rss_kb(),
+        "virtual_seconds": round(clock.now, 3),
+    }
+
+
+def run_isolated(engine, size, ticks):
+    """Run a case in a fresh interpreter so peak RSS is per case"""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--case", engine, str(size), "--ticks", str(ticks)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def compare(old_path, new_path):
+    """Print per-case ratios between two benchmark result files"""
+    with open(old_path) as f:
+        old = {(r["engine"], r["size_bytes"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    for result in new:
+        before = old.get((result["engine"], result["size_bytes"]))
+        if not before:
+            continue
+        for key in ("ticks_per_sec", "frame_ms_p99", "load_text_ms", "load_text_warm_ms", "peak_rss_kb"):
+            if before.get(key) and result.get(key) is not None:
+                ratio = result[key] / before[key]
+                print(f"{result['engine']:>20} {result['size_bytes']:>12} {key:>16}: "
+                      f"{before[key]} -> {result[key]} ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoScroll engine benchmarks")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated, e.g. 1K,1M,100M,1G")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="engines to run")
+    parser.add_argument("--ticks", type=int, default=500, help="ticks per case")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--case", nargs=2, metavar=("ENGINE", "SIZE"), help=argparse.SUPPRESS)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.ticks)))
+        return
+
+    results = []
+    for size in (parse_size(s) for s in args.sizes.split(",")):
+        for engine in args.engines.split(","):
+            print(f"⏱️ {engine} {size} bytes...", file=sys.stderr)
+            results.append(run_isolated(engine, size, args.ticks))
+
+    report = json.dumps({
+        "format": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
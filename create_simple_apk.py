@@ -3,9 +3,205 @@
 Create a simple APK using alternative methods
 """
 
+import gzip
+import hashlib
+import json
 import os
+import re
 import subprocess
-import shutil
+
+# Web files shipped inside the apps: source file -> name in the app
+WEB_ASSETS = {
+    'manifest.json': 'manifest.json',
+    'web_autoscroll.html': 'index.html',
+}
+# Entry points keep their names; every other asset gets its content hash in the name
+ENTRY_ASSETS = {'index.html', 'sw.js'}
+# Record of what the last build wrote, kept next to the assets
+ASSET_STATE = '.asset-manifest.json'
+# Smaller files are not worth a precompressed copy
+PRECOMPRESS_MIN_BYTES = 1024
+
+SERVICE_WORKER = """// Generated by create_simple_apk.py from the hashed asset list - do not edit
+const CACHE_NAME = 'autoscroll-precache';
+const PRECACHE = __PRECACHE__;
+
+function cacheKey(url, revision) {
+  return new URL(url, self.location).href + '?__rev=' + revision;
+}
+const KEYS = new Map(PRECACHE.map(([url, revision]) =>
+  [new URL(url, self.location).href, cacheKey(url, revision)]));
+
+self.addEventListener('install', event => {
+  event.waitUntil(caches.open(CACHE_NAME).then(cache =>
+    Promise.all(PRECACHE.map(([url, revision]) => {
+      const key = cacheKey(url, revision);
+      // Files whose revision is already cached are not downloaded again
+      return cache.match(key).then(hit => hit || fetch(url, {cache: 'no-cache'}).then(response => {
+        if (!response.ok) throw new Error('Failed to fetch ' + url);
+        return cache.put(key, response);
+      }));
+    }))
+  ).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+  const current = new Set(KEYS.values());
+  event.waitUntil(caches.keys().then(names =>
+    Promise.all(names.filter(name => name !== CACHE_NAME).map(name => caches.delete(name)))
+  ).then(() => caches.open(CACHE_NAME)).then(cache => cache.keys().then(requests =>
+    Promise.all(requests.filter(request => !current.has(request.url)).map(request => cache.delete(request)))
+  )).then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+  const url = new URL(event.request.url);
+  url.hash = '';
+  const key = KEYS.get(url.href);
+  if (!key) return;
+  event.respondWith(caches.open(CACHE_NAME)
+    .then(cache => cache.match(key))
+    .then(response => response || fetch(event.request)));
+});
+"""
+
+def content_hash(data):
+    """Short content hash used in asset names and revisions"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};:,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+def minify_js(js):
+    """Drop indentation, blank lines and whole-line comments; line breaks stay for ASI"""
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def minify_html(html):
+    """Minify inline CSS/JS, drop comments and collapse whitespace between tags
+
+    Tags, attribute values and the contents of pre/textarea are left alone.
+    """
+    pattern = re.compile(r'<!--(?!\[if).*?-->|(?:(<(script|style|textarea|pre)\b[^>]*>)(.*?)</\2>)|<[^>]*>', re.S | re.I)
+    parts = []
+    last = 0
+    for match in pattern.finditer(html):
+        text = html[last:match.start()]
+        if text and not text.strip():
+            text = '' if parts and parts[-1] == '\n' else '\n'
+        if text:
+            parts.append(text)
+        last = match.end()
+        token = match.group(0)
+        if token.startswith('<!--'):
+            continue
+        if match.group(2):
+            tag = match.group(2)
+            if tag.lower() == 'style':
+                token = f"{match.group(1)}{minify_css(match.group(3))}</{tag}>"
+            elif tag.lower() == 'script':
+                token = f"{match.group(1)}{minify_js(match.group(3))}</{tag}>"
+        parts.append(token)
+    parts.append(html[last:].strip())
+    return ''.join(parts).strip()
+
+def minify(name, text):
+    if name.endswith('.json'):
+        return json.dumps(json.loads(text), separators=(',', ':'), ensure_ascii=False)
+    if name.endswith('.html'):
+        return minify_html(text)
+    if name.endswith('.js'):
+        return minify_js(text)
+    return text
+
+def write_if_changed(path, data):
+    """Write bytes unless the file already holds exactly them; True if written"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+def publish_asset(out_dir, name, data, written, precompress=False):
+    """Write an asset, and with `precompress` its gzip copy, if their contents changed"""
+    if write_if_changed(os.path.join(out_dir, name), data):
+        written.append(name)
+    compressed_path = os.path.join(out_dir, name + '.gz')
+    if precompress and len(data) >= PRECOMPRESS_MIN_BYTES:
+        compressed = gzip.compress(data, 9, mtime=0)
+        if len(compressed) < len(data):
+            if write_if_changed(compressed_path, compressed):
+                written.append(name + '.gz')
+            return
+    if os.path.exists(compressed_path):
+        os.remove(compressed_path)  # left by a build that did precompress
+
+def build_web_assets(out_dir, precompress=False):
+    """Minify and hash the web assets into out_dir
+
+    Only files whose content changed are rewritten, and only files the
+    previous build created are removed, along with unhashed copies of
+    hashed assets from before names were hashed. sw.js is generated with
+    the hashed file list so the offline cache refreshes just the changed
+    files. Gzip copies are only useful to a server that sends them as is;
+    neither app's WebView does, so they are made only with `precompress`.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    state_path = os.path.join(out_dir, ASSET_STATE)
+    try:
+        with open(state_path) as f:
+            previous = json.load(f)
+    except (FileNotFoundError, ValueError):
+        previous = {}
+
+    # Hashed names are decided first so references to them can be rewritten
+    sources = {}
+    for source, name in WEB_ASSETS.items():
+        with open(source, encoding='utf-8') as f:
+            sources[source] = minify(name, f.read())
+    renames = dict(WEB_ASSETS)
+    for source, name in WEB_ASSETS.items():
+        if name not in ENTRY_ASSETS:
+            stem, ext = os.path.splitext(name)
+            # Hashed assets only refer to entry points, whose names never change,
+            # so hashing them before references are rewritten is stable
+            renames[source] = f"{stem}.{content_hash(sources[source].encode('utf-8'))[:10]}{ext}"
+
+    outputs = {}
+    for source, text in sources.items():
+        for old, new in renames.items():
+            text = re.sub(r'(["\'])(\./)?' + re.escape(old) + r'\1',
+                          lambda m: f"{m.group(1)}{m.group(2) or ''}{new}{m.group(1)}", text)
+        outputs[renames[source]] = text.encode('utf-8')
+
+    precache = [['./', content_hash(outputs['index.html'])]]
+    precache += [[name, content_hash(data)] for name, data in sorted(outputs.items())]
+    outputs['sw.js'] = SERVICE_WORKER.replace('__PRECACHE__', json.dumps(precache)).encode('utf-8')
+
+    written = []
+    for name, data in outputs.items():
+        publish_asset(out_dir, name, data, written, precompress)
+    current = {name: content_hash(data) for name, data in outputs.items()}
+
+    # Remove only hashed files an earlier build produced and this one did not
+    unhashed = [name for name in WEB_ASSETS.values() if name not in ENTRY_ASSETS]
+    for name in [*previous, *unhashed]:
+        if name not in current:
+            for stale in (name, name + '.gz'):
+                if os.path.exists(os.path.join(out_dir, stale)):
+                    os.remove(os.path.join(out_dir, stale))
+    write_if_changed(state_path, (json.dumps(current, indent=2, sort_keys=True) + '\n').encode('utf-8'))
+
+    skipped = len(outputs) - len([name for name in written if not name.endswith('.gz')])
+    print(f"📦 Web assets: {len(written)} file(s) written, {skipped} unchanged, in {out_dir}")
+    return current
 
 def create_cordova_app():
     """Create a Cordova-based APK from our PWA"""
@@ -24,25 +220,21 @@ def create_cordova_app():
             print(f"❌ Failed to install Cordova: {e}")
             return False
     
-    # Create Cordova project
+    # Create Cordova project (once; later runs only refresh what changed)
     try:
-        if os.path.exists('autoscroll-cordova'):
-            shutil.rmtree('autoscroll-cordova')
-        
-        subprocess.run([
-            'cordova', 'create', 'autoscroll-cordova', 
-            'com.deathknell837.autoscroll', 'AutoScrollReader'
-        ], check=True)
+        if not os.path.exists('autoscroll-cordova'):
+            subprocess.run([
+                'cordova', 'create', 'autoscroll-cordova', 
+                'com.deathknell837.autoscroll', 'AutoScrollReader'
+            ], check=True)
         
-        # Copy our PWA files
-        www_dir = 'autoscroll-cordova/www'
-        shutil.copy('web_autoscroll.html', f'{www_dir}/index.html')
-        shutil.copy('manifest.json', f'{www_dir}/manifest.json')
-        shutil.copy('sw.js', f'{www_dir}/sw.js')
+        # Build our PWA files into the project
+        build_web_assets('autoscroll-cordova/www')
         
         # Add Android platform
         os.chdir('autoscroll-cordova')
-        subprocess.run(['cordova', 'platform', 'add', 'android'], check=True)
+        if not os.path.exists(os.path.join('platforms', 'android')):
+            subprocess.run(['cordova', 'platform', 'add', 'android'], check=True)
         
         # Build APK
         subprocess.run(['cordova', 'build', 'android'], check=True)
@@ -60,18 +252,14 @@ def create_webview_apk():
     
     # Create Android project structure
     project_dir = "autoscroll-webview"
-    if os.path.exists(project_dir):
-        shutil.rmtree(project_dir)
     
     os.makedirs(f"{project_dir}/app/src/main/java/com/deathknell837/autoscroll", exist_ok=True)
     os.makedirs(f"{project_dir}/app/src/main/res/layout", exist_ok=True)
     os.makedirs(f"{project_dir}/app/src/main/res/values", exist_ok=True)
     os.makedirs(f"{project_dir}/app/src/main/assets", exist_ok=True)
     
-    # Copy web files to assets
-    shutil.copy('web_autoscroll.html', f'{project_dir}/app/src/main/assets/index.html')
-    shutil.copy('manifest.json', f'{project_dir}/app/src/main/assets/')
-    shutil.copy('sw.js', f'{project_dir}/app/src/main/assets/')
+    # Build web files into assets
+    build_web_assets(f'{project_dir}/app/src/main/assets')
     
     # Create MainActivity.java
     main_activity = '''package com.deathknell837.autoscroll;
@@ -96,8 +284,7 @@ public class MainActivity extends Activity {
     }
 }'''
     
-    with open(f"{project_dir}/app/src/main/java/com/deathknell837/autoscroll/MainActivity.java", 'w') as f:
-        f.write(main_activity)
+    write_if_changed(f"{project_dir}/app/src/main/java/com/deathknell837/autoscroll/MainActivity.java", main_activity.encode('utf-8'))
     
     # Create layout
     layout_xml = '''<?xml version="1.0" encoding="utf-8"?>
@@ -113,8 +300,7 @@ public class MainActivity extends Activity {
 
 </LinearLayout>'''
     
-    with open(f"{project_dir}/app/src/main/res/layout/activity_main.xml", 'w') as f:
-        f.write(layout_xml)
+    write_if_changed(f"{project_dir}/app/src/main/res/layout/activity_main.xml", layout_xml.encode('utf-8'))
     
     # Create strings.xml
     strings_xml = '''<?xml version="1.0" encoding="utf-8"?>
@@ -122,8 +308,7 @@ public class MainActivity extends Activity {
     <string name="app_name">AutoScroll Text Reader</string>
 </resources>'''
     
-    with open(f"{project_dir}/app/src/main/res/values/strings.xml", 'w') as f:
-        f.write(strings_xml)
+    write_if_changed(f"{project_dir}/app/src/main/res/values/strings.xml", strings_xml.encode('utf-8'))
     
     print("✅ WebView project structure created")
     print(f"📁 Project created in: {project_dir}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Load-test client for the AutoScroll scroll server
+Opens many concurrent sessions, scrolls them all and prints JSON statistics
+
+Usage:
+    python main.py --serve 8765 book.txt &
+    python loadtest.py --sessions 2000 --duration 20
+    python loadtest.py --port 8765 --sessions 500 --speed 5 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from autoscroll.server import DEFAULT_HOST, DEFAULT_PORT, raise_file_limit
+from benchmark import percentile
+
+# New connections opened per second, so the server's accept queue is not flooded
+CONNECT_RATE = 500
+
+
+class Reader:
+    """One simulated reader and what it received"""
+
+    def __init__(self):
+        self.frames = 0
+        self.errors = 0
+        self.gaps = []  # seconds between consecutive frames
+        self.last = None
+
+    async def run(self, host, port, args, stop_at):
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        try:
+            for command in (
+                {"cmd": "open", "doc": args.doc, "width": args.width, "rows": args.rows},
+                {"cmd": "speed", "value": args.speed},
+                {"cmd": "start"},
+            ):
+                writer.write(json.dumps(command).encode() + b"\n")
+            await writer.drain()
+            while True:
+                timeout = stop_at - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    line = await asyncio.wait_for(reader.readline(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not line:
+                    break
+                kind = json.loads(line)["type"]
+                if kind == "frame":
+                    now = time.monotonic()
+                    if self.last is not None:
+                        self.gaps.append(now - self.last)
+                    self.last = now
+                    self.frames += 1
+                elif kind == "end":
+                    writer.write(b'{"cmd": "reset"}\n{"cmd": "start"}\n')
+                elif kind == "error":
+                    self.errors += 1
+        finally:
+            writer.close()
+
+
+async def load(args):
+    started = time.monotonic()
+    stop_at = started + args.duration
+    readers = [Reader() for _ in range(args.sessions)]
+    tasks = []
+    for i, reader in enumerate(readers):
+        tasks.append(asyncio.ensure_future(reader.run(args.host, args.port, args, stop_at)))
+        if i % CONNECT_RATE == CONNECT_RATE - 1:
+            await asyncio.sleep(1)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    failed = [r for r in results if isinstance(r, BaseException)]
+    elapsed = time.monotonic() - started
+
+    gaps = [gap for reader in readers for gap in reader.gaps]
+    frames = sum(reader.frames for reader in readers)
+    expected = 1.0 / args.speed
+    return {
+        "sessions": args.sessions,
+        "connect_failures": len(failed),
+        "first_failure": repr(failed[0]) if failed else None,
+        "duration_s": round(elapsed, 2),
+        "frames": frames,
+        "frames_per_sec": round(frames / elapsed, 1),
+        "expected_gap_ms": round(expected * 1000, 1),
+        "gap_ms_p50": round(percentile(gaps, 50) * 1000, 2),
+        "gap_ms_p99": round(percentile(gaps, 99) * 1000, 2),
+        "gap_ms_max": round(max(gaps, default=0.0) * 1000, 2),
+        "errors": sum(reader.errors for reader in readers),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoScroll server load test")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--sessions", type=int, default=1000, help="concurrent readers")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--speed", type=float, default=5.0, help="rows per second per session")
+    parser.add_argument("--doc", type=int, default=0, help="document number to open")
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    raise_file_limit()
+    print(f"⏱️ {args.sessions} sessions against {args.host}:{args.port} for {args.duration}s...", file=sys.stderr)
+    report = json.dumps(asyncio.run(load(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
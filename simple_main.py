@@ -4,31 +4,265 @@ Simple AutoScroll App - Minimal version for testing
 """
 
 try:
+    from kivy.config import Config
+    # Let the frame clock follow 90/120 Hz panels instead of Kivy's default 60 fps cap
+    Config.set('graphics', 'maxfps', '120')
     from kivy.app import App
     from kivy.uix.boxlayout import BoxLayout
     from kivy.uix.button import Button
     from kivy.uix.label import Label
+    from kivy.uix.progressbar import ProgressBar
     from kivy.uix.textinput import TextInput
     from kivy.uix.slider import Slider
-    from kivy.uix.scrollview import ScrollView
+    from kivy.uix.recycleview import RecycleView
+    from kivy.uix.recycleview.views import RecycleDataViewBehavior
     from kivy.clock import Clock
     from kivy.core.window import Window
+    from kivy.lang import Builder
+    from kivy.metrics import sp
     KIVY_AVAILABLE = True
 except ImportError:
     KIVY_AVAILABLE = False
     print("Kivy not available. This is a placeholder for the AutoScroll app.")
     print("Install Kivy with: pip install kivy")
 
+import threading
+import time
+from collections import deque
+
+from autoscroll.chunks import chunk_ranges, estimate_height, text_pieces
+from autoscroll.layout_cache import LayoutCache, document_hash
+from autoscroll.richtext import parse_markdown
+
+# Scrolling speed at 1.0x, in screen pixels per second
+PIXELS_PER_SECOND = 40.0
+# Longest frame gap applied in one step, so a stall never causes a visible jump
+MAX_FRAME_DT = 0.1
+# Reader font; part of the layout cache key
+READER_FONT = 'Roboto'
+READER_FONT_SIZE = 15
+
+
+def load_report(chunks, elapsed, longest, updates):
+    """One line on how long a load took and how long it held the UI thread"""
+    return (f"📥 Loaded {chunks} chunks in {elapsed * 1000:.0f} ms; "
+            f"longest UI-thread stall {longest * 1000:.1f} ms over {updates} updates")
+
+
 if KIVY_AVAILABLE:
     # Set window size for desktop testing
     Window.size = (360, 640)
 
+    # Only chunks near the viewport get a Label (and a texture); the rest are data
+    Builder.load_string('''
+<ChunkLabel>:
+    font_name: 'Roboto'
+    font_size: '15sp'
+    markup: True
+    text_size: self.width, None
+    size_hint_y: None
+    valign: 'top'
+
+<ChunkView>:
+    viewclass: 'ChunkLabel'
+    RecycleBoxLayout:
+        default_size: None, sp(60)
+        default_size_hint: 1, None
+        size_hint_y: None
+        height: self.minimum_height
+        orientation: 'vertical'
+        spacing: sp(12)
+''')
+
+    class ChunkLabel(RecycleDataViewBehavior, Label):
+        """One paragraph chunk; reports its real height once rendered"""
+        index = None
+        view = None
+
+        def refresh_view_attrs(self, rv, index, data):
+            self.index = index
+            self.view = rv
+            return super().refresh_view_attrs(rv, index, data)
+
+        def on_texture_size(self, instance, size):
+            if self.view is not None and self.index is not None:
+                self.view.update_height(self.index, size[1], self.width)
+
+    # Wrapped chunk heights per (document, width, font), shared across rotations and reloads
+    LAYOUT_CACHE = LayoutCache()
+
+    class ChunkView(RecycleView):
+        """RecycleView over paragraph chunks with estimated then measured heights"""
+
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.chunks = []
+            self.markup = []
+            self.doc_hash = None
+            self.heights = None
+            self.layout_width = None
+            # Called on the UI thread with the fraction loaded, then with None when done
+            self.on_progress = None
+            self.loading = False
+            self._generation = 0
+            self._batches = deque()
+            self._load = None
+            self._content_height = None
+            self._relayout = Clock.create_trigger(lambda dt: self.refresh_from_data())
+            self._rewrap = Clock.create_trigger(lambda dt: self.apply_layout())
+            self.bind(width=lambda *args: self._rewrap())
+            self.layout_manager.bind(height=self._content_resized)
+
+        def set_text(self, text):
+            """Prepare and show a text at once, on the UI thread"""
+            started = time.perf_counter()
+            self._generation += 1  # drops a load still in progress
+            self.loading = False
+            # Markdown is parsed once here; views only receive the prebuilt markup
+            rich = parse_markdown(text)
+            ranges = chunk_ranges(rich.plain)
+            self.chunks = [rich.plain[start:end] for start, end in ranges]
+            self.markup = [rich.markup(start, end) for start, end in ranges]
+            self.doc_hash = document_hash(text)
+            self.layout_width = None
+            self.apply_layout()
+            blocked = time.perf_counter() - started
+            print(load_report(len(self.chunks), blocked, blocked, 1))
+
+        def load_text(self, text):
+            """Prepare a text on a worker thread and show it piece by piece
+
+            The first screenful is posted as soon as it is ready, later pieces
+            as they are; the UI thread only appends what arrived since the
+            last frame.
+            """
+            self._generation += 1
+            self.loading = True
+            self.chunks, self.markup, self.heights = [], [], []
+            self.doc_hash = None
+            self.data = []
+            self.scroll_y = 1.0
+            self.layout_width = int(self.width or Window.width - 20)
+            # Time spent and longest stretch spent on the UI thread for this load
+            self._load = {'started': time.perf_counter(), 'busy': 0.0, 'longest': 0.0, 'updates': 0}
+            worker = threading.Thread(
+                target=self._prepare,
+                args=(self._generation, text, self.layout_width, sp(READER_FONT_SIZE)),
+                name='text-loader',
+                daemon=True,
+            )
+            worker.start()
+
+        def _prepare(self, generation, text, width, font_size):
+            """Worker thread: normalize, parse, chunk and estimate, piece by piece"""
+            text = text.replace('\r\n', '\n').strip()
+            done = 0
+            for piece in text_pieces(text):
+                if generation != self._generation:
+                    return  # another text was loaded meanwhile
+                rich = parse_markdown(piece)
+                ranges = chunk_ranges(rich.plain)
+                chunks = [rich.plain[start:end] for start, end in ranges]
+                markup = [rich.markup(start, end) for start, end in ranges]
+                heights = [estimate_height(chunk, width, font_size) for chunk in chunks]
+                done += len(piece)
+                self._post((generation, chunks, markup, heights, done / len(text), None))
+            self._post((generation, [], [], [], 1.0, document_hash(text)))
+
+        def _post(self, batch):
+            self._batches.append(batch)
+            Clock.schedule_once(self._take_batches)
+
+        def _take_batches(self, dt):
+            """Append every batch that has arrived since the last frame"""
+            started = time.perf_counter()
+            data = []
+            progress = doc_hash = None
+            while self._batches:
+                generation, chunks, markup, heights, fraction, finished = self._batches.popleft()
+                if generation != self._generation:
+                    continue
+                progress, doc_hash = fraction, finished
+                self.chunks += chunks
+                self.markup += markup
+                self.heights += heights
+                data += [{'text': text, 'height': height} for text, height in zip(markup, heights)]
+            if progress is None:
+                return  # everything was for an older load
+            if data:
+                self.data.extend(data)
+            load = self._load
+            elapsed = time.perf_counter() - started
+            load['busy'] += elapsed
+            load['longest'] = max(load['longest'], elapsed)
+            load['updates'] += 1
+            if doc_hash is not None:
+                self._finish_load(doc_hash)
+            elif self.on_progress is not None:
+                self.on_progress(progress)
+
+        def _finish_load(self, doc_hash):
+            load = self._load
+            self.loading = False
+            self.doc_hash = doc_hash
+            key = LAYOUT_CACHE.key(doc_hash, self.layout_width, (READER_FONT, READER_FONT_SIZE))
+            heights = LAYOUT_CACHE.get(key)
+            if heights is not None and len(heights) == len(self.chunks):
+                self.heights = heights
+                self.data = [{'text': markup, 'height': height} for markup, height in zip(self.markup, heights)]
+            else:
+                self.heights = LAYOUT_CACHE.put(key, self.heights)
+            print(load_report(len(self.chunks), time.perf_counter() - load['started'],
+                              load['longest'], load['updates']))
+            if self.on_progress is not None:
+                self.on_progress(None)
+            # The width may have changed while the text was loading
+            self._rewrap()
+
+        def _content_resized(self, layout, height):
+            """Keep the rows on screen in place while chunks are appended below"""
+            previous, self._content_height = self._content_height, height
+            if not self.loading or previous is None or self.scroll_y >= 1.0:
+                return
+            top = (1.0 - self.scroll_y) * max(0.0, previous - self.height)
+            self.scroll_y = 1.0 - top / (height - self.height) if height > self.height else 1.0
+
+        def apply_layout(self):
+            """Use the cached heights for the current width, or estimate new ones"""
+            if self.loading:
+                return  # laid out again once the load is complete
+            width = int(self.width or Window.width - 20)
+            if width == self.layout_width:
+                return
+            self.layout_width = width
+            font_size = sp(READER_FONT_SIZE)
+            key = LAYOUT_CACHE.key(self.doc_hash, width, (READER_FONT, READER_FONT_SIZE))
+            heights = LAYOUT_CACHE.get(key)
+            if heights is None or len(heights) != len(self.chunks):
+                heights = LAYOUT_CACHE.put(key, [estimate_height(chunk, width, font_size) for chunk in self.chunks])
+            self.heights = heights
+            self.data = [
+                {'text': markup, 'height': height}
+                for markup, height in zip(self.markup, heights)
+            ]
+            print(LAYOUT_CACHE.report())
+
+        def update_height(self, index, height, width):
+            if int(width) != self.layout_width:
+                return  # measured for a width we have already left
+            if index < len(self.data) and height and self.data[index]['height'] != height:
+                self.data[index]['height'] = height
+                self.heights[index] = height  # the cached layout learns the real height
+                self._relayout()
+
     class SimpleAutoScrollApp(App):
         def __init__(self, **kwargs):
             super().__init__(**kwargs)
             self.scroll_speed = 1.0
             self.is_scrolling = False
             self.scroll_event = None
+            self.subpixel = 0.0
+            self.resume_on_restore = False
             
         def build(self):
             self.title = "AutoScroll Reader"
@@ -53,14 +287,14 @@ if KIVY_AVAILABLE:
             load_btn.bind(on_press=self.load_text)
             layout.add_widget(load_btn)
             
-            # Scroll view
-            self.scroll_view = ScrollView()
-            self.text_label = Label(
-                text='Your text will appear here...',
-                text_size=(None, None),
-                valign='top'
-            )
-            self.scroll_view.add_widget(self.text_label)
+            # Shown while a text loads in the background
+            self.load_bar = ProgressBar(max=1.0, value=0, size_hint_y=None, height=0, opacity=0)
+            layout.add_widget(self.load_bar)
+            
+            # Virtualized text view
+            self.scroll_view = ChunkView()
+            self.scroll_view.set_text('Your text will appear here...')
+            self.scroll_view.on_progress = self.on_load_progress
             layout.add_widget(self.scroll_view)
             
             # Controls
@@ -87,14 +321,23 @@ if KIVY_AVAILABLE:
             controls.add_widget(btn_layout)
             layout.add_widget(controls)
             
+            Window.bind(on_minimize=self.on_window_minimize, on_restore=self.on_window_restore)
+            
             return layout
         
         def load_text(self, instance):
-            text = self.text_input.text.strip()
-            if text:
-                self.text_label.text = text
-                self.text_label.text_size = (Window.width - 20, None)
-                self.scroll_view.scroll_y = 1.0
+            text = self.text_input.text
+            if text and not text.isspace():
+                self.scroll_view.load_text(text)
+                self.on_load_progress(0.0)
+        
+        def on_load_progress(self, fraction):
+            """Show the load bar while a text loads; None hides it"""
+            if fraction is None:
+                self.load_bar.height, self.load_bar.opacity = 0, 0
+                return
+            self.load_bar.height, self.load_bar.opacity = 6, 1
+            self.load_bar.value = fraction
         
         def toggle_scroll(self, instance):
             if self.is_scrolling:
@@ -105,22 +348,40 @@ if KIVY_AVAILABLE:
         def start_scroll(self):
             self.is_scrolling = True
             self.play_btn.text = 'Pause'
-            self.scroll_event = Clock.schedule_interval(self.auto_scroll, 1/30.0)
+            self.subpixel = 0.0
+            # Interval 0 runs once per rendered frame, at the display's rate
+            if not self.scroll_event:
+                self.scroll_event = Clock.schedule_interval(self.auto_scroll, 0)
         
         def stop_scroll(self):
             self.is_scrolling = False
             self.play_btn.text = 'Play'
+            self.suspend_ticks()
+        
+        def suspend_ticks(self):
+            """Unschedule the frame callback so an idle reader costs no CPU"""
             if self.scroll_event:
                 self.scroll_event.cancel()
+                self.scroll_event = None
         
         def auto_scroll(self, dt):
             if not self.is_scrolling:
+                self.scroll_event = None
                 return False
             
-            scroll_amount = self.scroll_speed * dt * 0.02
-            current_scroll = self.scroll_view.scroll_y
-            new_scroll = max(0, current_scroll - scroll_amount)
+            # Accumulate fractional pixels and only move by whole ones
+            distance = self.scroll_speed * PIXELS_PER_SECOND * min(dt, MAX_FRAME_DT) + self.subpixel
+            step = int(distance)
+            self.subpixel = distance - step
+            if not step:
+                return True
             
+            # Pixel distance -> normalized scroll_y, so speed ignores document length
+            _, scroll_amount = self.scroll_view.convert_distance_to_scroll(0, step)
+            if scroll_amount <= 0:
+                self.stop_scroll()  # everything already fits on screen
+                return False
+            new_scroll = max(0, self.scroll_view.scroll_y - scroll_amount)
             self.scroll_view.scroll_y = new_scroll
             
             if new_scroll <= 0:
@@ -129,6 +390,22 @@ if KIVY_AVAILABLE:
             
             return True
         
+        def on_pause(self):
+            # Backgrounded on Android: stop ticking until we are visible again
+            self.resume_on_restore = self.is_scrolling
+            self.suspend_ticks()
+            return True
+        
+        def on_resume(self):
+            if self.resume_on_restore and self.is_scrolling:
+                self.start_scroll()
+        
+        def on_window_minimize(self, *args):
+            self.on_pause()
+        
+        def on_window_restore(self, *args):
+            self.on_resume()
+        
         def reset_scroll(self, instance):
             self.scroll_view.scroll_y = 1.0
             if self.is_scrolling:
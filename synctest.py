@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Skew measurement for AutoScroll leader/follower sync
+Runs a leader and several followers in one process over loopback UDP and
+prints, as JSON, how far apart in time each row appears on the displays
+
+Usage:
+    python synctest.py
+    python synctest.py --followers 4 --speed 5 --duration 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+from autoscroll.app import SimpleAutoScrollApp, SAMPLE_TEXT
+from autoscroll.renderer import TerminalRenderer
+from autoscroll.sync import SyncLeader, SyncFollower
+from benchmark import CapturedTerminal, percentile
+
+# One display frame at 60 Hz, the skew budget
+FRAME_SECONDS = 1 / 60
+
+
+def record_rows(app, shown):
+    """Note the monotonic time at which each position is first drawn"""
+    render_frame = app.render_frame
+
+    def recording_render_frame():
+        shown.setdefault(app.scroll_position, time.monotonic())
+        return render_frame()
+
+    app.render_frame = recording_render_frame
+
+
+def make_app(text):
+    app = SimpleAutoScrollApp()
+    app.renderer = TerminalRenderer(CapturedTerminal(), ansi=True)
+    app.load_text(text)
+    return app
+
+
+def run(followers, speed, duration):
+    os.environ["COLUMNS"], os.environ["LINES"] = "80", "24"
+    # Long enough that no display reaches the end during the run
+    text = "\n\n".join([SAMPLE_TEXT] * int(speed * duration))
+    with contextlib.redirect_stdout(io.StringIO()):
+        leader = make_app(text)
+        leader.sync = SyncLeader(leader, "127.0.0.1:0")
+        leader.sync.start()
+        port = leader.sync.sock.getsockname()[1]
+        apps = [make_app(text) for _ in range(followers)]
+        for app in apps:
+            app.sync = SyncFollower(app, f"127.0.0.1:{port}")
+            app.sync.start()
+        time.sleep(1.0)  # let the followers estimate the clock offset
+
+        shown = [{} for _ in range(followers + 1)]
+        for app, rows in zip([leader] + apps, shown):
+            record_rows(app, rows)
+        leader.set_speed(speed)
+        leader.start_scroll()
+        time.sleep(duration)
+        leader.pause_scroll()
+        reports = [app.sync.report() for app in apps]
+        for app in [leader] + apps:
+            app.shutdown()
+
+    lead, rest = shown[0], shown[1:]
+    positions = [p for p in lead if all(p in rows for rows in rest)]
+    to_leader = [abs(rows[p] - lead[p]) for rows in rest for p in positions]
+    between = [max(rows[p] for rows in rest) - min(rows[p] for rows in rest) for p in positions]
+    return {
+        "followers": followers,
+        "speed": speed,
+        "rows_compared": len(positions),
+        "rows_missed": sum(len(lead) - sum(p in rows for p in lead) for rows in rest),
+        "frame_ms": round(FRAME_SECONDS * 1000, 2),
+        "skew_to_leader_ms_p50": round(percentile(to_leader, 50) * 1000, 3),
+        "skew_to_leader_ms_p99": round(percentile(to_leader, 99) * 1000, 3),
+        "skew_between_followers_ms_p50": round(percentile(between, 50) * 1000, 3),
+        "skew_between_followers_ms_p99": round(percentile(between, 99) * 1000, 3),
+        "skew_between_followers_ms_max": round(max(between, default=0.0) * 1000, 3),
+        "sync": reports,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoScroll sync skew test")
+    parser.add_argument("--followers", type=int, default=3)
+    parser.add_argument("--speed", type=float, default=5.0, help="rows per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to scroll")
+    args = parser.parse_args()
+    print(json.dumps(run(args.followers, args.speed, args.duration), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()